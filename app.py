@@ -1,60 +1,29 @@
 import streamlit as st
-import pandas as pd
-import pydeck as pdk
 import numpy as np
-import requests
-import os
-from PIL import Image
+import itertools
+import time
+from saferoute.cache import make_key
+from saferoute.config import dept_coords, dept_display_map, DEPT_OPTIONS, days_list, hours_list, surface_list, road_cat_list, speed_list, SEVERITY_TEXT_MAP, MAX_SCENARIOS
+from saferoute.styles import APP_CSS, HEADER_TITLE_HTML, HEADER_BADGE_HTML, FOOTER_HTML, risk_card_html
+from saferoute.scoring import get_risk_style, risk_cell_css, risk_colors, hex_to_rgb, clean_probabilities, severity_risk
+from saferoute.resources import load_image_local, get_predictor, get_prediction_cache, get_risk_grid, get_http_client, get_single_flight, get_prediction_store, get_executor, get_admission_gate, session_bucket
+from saferoute.service import prediction_job, fetch_predictions, ProfileIncomplete, risk_profile
+from saferoute.maps import point_layer, make_deck, risk_layer
+from saferoute.timing import span, timings
+from saferoute.admin import setup_metrics_export, admin_requested, render_admin
 
 # --- 1. CONFIGURAÇÃO ---
 st.set_page_config(page_title="SafeRoute Île-de-France", page_icon="🛡️", layout="wide", initial_sidebar_state="collapsed")
 
 # --- 2. CSS ---
-st.markdown("""
-    <style>
-        @keyframes gradient { 0% { background-position: 0% 50%; } 50% { background-position: 100% 50%; } 100% { background-position: 0% 50%; } }
-        .stApp { background: linear-gradient(-45deg, #1e3a8a, #3b82f6, #06b6d4, #10b981); background-size: 400% 400%; animation: gradient 15s ease infinite; font-family: 'Inter', sans-serif; }
-        [data-testid="stSidebar"] { display: none; }
-        .glass-container { background: rgba(255, 255, 255, 0.90); backdrop-filter: blur(16px); -webkit-backdrop-filter: blur(16px); border-radius: 20px; border: 1px solid rgba(255, 255, 255, 0.6); padding: 1.5rem; box-shadow: 0 8px 32px 0 rgba(31, 38, 135, 0.15); margin-bottom: 2rem; }
-        .stSelectbox > div > div { background-color: #f8fafc !important; border: 1px solid #cbd5e1 !important; border-radius: 10px !important; color: #334155 !important; }
-        .stButton > button { background: #0f172a !important; color: white !important; border: none; border-radius: 12px; padding: 0.8rem 2rem; font-weight: 600; width: 100%; transition: all 0.3s ease; margin-top: 1rem; }
-        .stButton > button:hover { transform: translateY(-2px); background: #334155 !important; }
-        .custom-title { font-size: 3.5rem; font-weight: 900; letter-spacing: -2px; margin: 0; line-height: 1; background: -webkit-linear-gradient(45deg, #0f172a 30%, #2563eb 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent; }
-        .custom-subtitle { font-size: 1.1rem; font-weight: 700; color: #475569; margin-bottom: 0px; text-transform: uppercase; letter-spacing: 2px; opacity: 0.9; }
-        .ver-badge { background: #e2e8f0; color: #475569; padding: 6px 12px; border-radius: 20px; font-size: 12px; font-weight: 700; white-space: nowrap; }
-    </style>
-""", unsafe_allow_html=True)
-
-# --- 3. DADOS ---
-dept_coords = {'Paris': (48.8566, 2.3522), 'Seine-et-Marne': (48.8411, 2.9994), 'Yvelines': (48.8049, 1.9090), 'Essonne': (48.5228, 2.2285), 'Hauts-de-Seine': (48.8306, 2.2215), 'Seine-Saint-Denis': (48.9112, 2.4699), 'Val-de-Marne': (48.7775, 2.4571), "Val-d'Oise": (49.0560, 2.1467)}
-dept_display_map = {'Paris': '75 (Paris)', 'Seine-et-Marne': '77 (Seine-et-Marne)', 'Yvelines': '78 (Yvelines)', 'Essonne': '91 (Essonne)', 'Hauts-de-Seine': '92 (Hauts-de-Seine)', 'Seine-Saint-Denis': '93 (Seine-Saint-Denis)', 'Val-de-Marne': '94 (Val-de-Marne)', "Val-d'Oise": "95 (Val-d'Oise)"}
-SEVERITY_TEXT_MAP = {"2": "Fatality (High Danger)", "3": "Hospitalized (Severe)", "4": "Slightly Injured (Minor)", 2: "Fatality (High Danger)", 3: "Hospitalized (Severe)", 4: "Slightly Injured (Minor)", "Death": "Fatality (High Danger)", "Hospitalized": "Hospitalized (Severe)", "Slightly injured": "Slightly Injured (Minor)"}
-days_list, hours_list = ['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'], list(range(24))
-surface_list, road_cat_list = ['Normal','Wet / Slippery'], ['Major Roads','Secondary Roads','Local & Access Roads','Other / Off-Network']
-speed_list = [10,20,30,40,50,60,70,80,90,100,110,130]
-
-# --- 4. FUNÇÕES ---
-def get_risk_style(prob_severity):
-    if prob_severity < 0.15: return {"color": "#10B981", "label": "LOW RISK", "msg": "Conditions likely safe."}
-    elif prob_severity < 0.40: return {"color": "#F59E0B", "label": "MODERATE", "msg": "Increased vigilance required."}
-    else: return {"color": "#EF4444", "label": "CRITICAL", "msg": "High probability of severe accident."}
-
-@st.cache_data
-def load_image_local():
-    # Procura a imagem na mesma pasta deste arquivo
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    img_path = os.path.join(current_dir, "image_0.png")
-    try:
-        img = Image.open(img_path).convert("RGBA")
-        data = np.array(img)
-        red, green, blue, alpha = data.T
-        white_areas = (red > 240) & (green > 240) & (blue > 240)
-        data[..., 3][white_areas.T] = 0
-        return Image.fromarray(data)
-    except Exception:
-        return None
-
-# --- 5. LAYOUT ---
+st.markdown(APP_CSS, unsafe_allow_html=True)
+setup_metrics_export()
+
+# --- 4. LAYOUT ---
+if admin_requested():
+    render_admin(lambda: {"Prediction cache": get_prediction_cache().stats(), "Request coalescing": get_single_flight().stats(), "Admission control": get_admission_gate().stats(), "Offline store": {**get_prediction_store().stats(), "refresher": get_prediction_store().refresher.stats()} if get_prediction_store() else {}, "Circuit breaker": {"state": get_http_client("primary").breaker.state, "failures": get_http_client("primary").breaker.failures}, "Backends": get_predictor().stats() if hasattr(get_predictor(), "stats") else {"model_version": get_predictor().model_version}})
+    st.stop()
+
 logo_img = load_image_local()
 
 st.markdown("<div class='glass-container' style='padding-bottom: 1rem;'>", unsafe_allow_html=True)
@@ -62,56 +31,169 @@ c1, c2, c3 = st.columns([1.2, 4, 1])
 with c1:
     if logo_img: st.image(logo_img, width=260)
     else: st.write("SafeRoute")
-with c2: st.markdown("<div style='margin-top: 50px; margin-left: -60px;'><p class='custom-subtitle'>AI Risk System</p><h1 class='custom-title'>Île-de-France</h1></div>", unsafe_allow_html=True)
-with c3: st.markdown("<div style='text-align: right; margin-top: 60px;'><span class='ver-badge'>v3.1 Pro</span></div>", unsafe_allow_html=True)
+with c2: st.markdown(HEADER_TITLE_HTML, unsafe_allow_html=True)
+with c3: st.markdown(HEADER_BADGE_HTML, unsafe_allow_html=True)
 st.markdown("</div>", unsafe_allow_html=True)
 
 st.markdown("<div class='glass-container'><h4 style='margin-bottom: 20px; color: #334155;'>Incident Parameters</h4>", unsafe_allow_html=True)
+mode = st.radio("Mode", ["Single scenario", "Compare scenarios", "24h × week profile", "Île-de-France map"], horizontal=True, label_visibility="collapsed")
+batch_mode, profile_mode, map_mode = mode == "Compare scenarios", mode == "24h × week profile", mode == "Île-de-France map"
+def pick(label, options, **kw):
+    # Em modo batch cada selectbox aceita vários valores
+    if batch_mode: return st.multiselect(label, options, default=options[:1], **kw)
+    return st.selectbox(label, options, **kw)
 c1, c2, c3 = st.columns(3)
 with c1:
-    s_dept = st.selectbox("Department", list(dept_coords.keys()), format_func=lambda x: dept_display_map[x])
-    s_road = st.selectbox("Road Category", road_cat_list)
+    s_dept = pick("Department", DEPT_OPTIONS, format_func=lambda x: dept_display_map[x], disabled=map_mode)
+    s_road = pick("Road Category", road_cat_list)
 with c2:
-    s_day = st.selectbox("Day of Week", days_list)
-    s_speed = st.selectbox("Speed Limit (km/h)", speed_list)
+    s_day = pick("Day of Week", days_list, disabled=profile_mode)
+    s_speed = pick("Speed Limit (km/h)", speed_list)
 with c3:
-    s_hour = st.selectbox("Time of Day", hours_list, format_func=lambda x: f"{x:02d}:00")
-    s_surf = st.selectbox("Surface Condition", surface_list)
+    s_hour = pick("Time of Day", hours_list, format_func=lambda x: f"{x:02d}:00", disabled=profile_mode)
+    s_surf = pick("Surface Condition", surface_list)
+grid_mode = st.toggle("Grid mode (precomputed)", value=True) if get_risk_grid() is not None else False
 st.write(""); btn = st.button("Calculate Severity Probability ⚡"); st.markdown("</div>", unsafe_allow_html=True)
 
-# --- 6. API ---
-if btn:
-    params = {"department": dept_display_map[s_dept], "day_of_week": s_day, "hour": int(s_hour), "road_category": s_road, "speed_limit": int(s_speed), "surface_condition": s_surf}
-    ph = st.empty()
-    api_url = st.secrets.get("API_URL", "http://127.0.0.1:8000/predict")
-
-    with st.spinner('Analyzing...'):
-        try:
-            resp = requests.post(api_url, params=params, timeout=10)
-            if resp.status_code == 200:
-                res = resp.json()
-                raw_probs = res.get("probabilities", {})
-                clean_probs = {k: (float(str(v).strip('%'))/100) for k, v in raw_probs.items()}
-
-                risk = clean_probs.get("Death", 0.0) + clean_probs.get("Hospitalized", 0.0)
-                style = get_risk_style(risk)
-                txt = SEVERITY_TEXT_MAP.get(res.get("severity_text"), res.get("severity_text"))
-
-                with ph.container():
-                    st.markdown(f"<div class='glass-container' style='border-left: 10px solid {style['color']}; padding: 1.5rem;'><h5 style='color:#64748b'>Severity Risk Level</h5><h1 style='color:{style['color']}'>{risk:.1%}</h1><h3 style='color:#334155'>Most Likely: {txt}</h3><p style='color:#64748b'>{style['msg']}</p></div>", unsafe_allow_html=True)
-                    c_map, c_det = st.columns([2, 1])
-                    with c_det:
-                        st.markdown("<h4 style='color: white; border-bottom: 1px solid rgba(255,255,255,0.3)'>Detailed Analysis</h4>", unsafe_allow_html=True)
-                        for k, v in raw_probs.items():
-                            st.markdown(f"<div style='color:white; display:flex; justify-content:space-between'><span>{k}</span><span>{v}</span></div>", unsafe_allow_html=True)
-                            st.progress(clean_probs[k])
-                    with c_map:
-                        hc = style['color'].lstrip('#'); rgb = tuple(int(hc[i:i+2], 16) for i in (0, 2, 4))
-                        coords = dept_coords[s_dept]
-                        df_m = pd.DataFrame({'lat': [coords[0]], 'lon': [coords[1]]})
-                        layer = pdk.Layer("ScatterplotLayer", df_m, get_position='[lon, lat]', get_fill_color=[*rgb, 160], get_radius=2000+(risk*10000), pickable=True, filled=True, get_line_color=[255,255,255], line_width_min_pixels=3)
-                        st.pydeck_chart(pdk.Deck(layers=[layer], initial_view_state=pdk.ViewState(latitude=coords[0], longitude=coords[1], zoom=10), map_style=pdk.map_styles.LIGHT))
-            else: st.error(f"API Error: {resp.text}")
-        except Exception as e: st.error(f"Connection Failed: {e}")
-
-st.markdown("<div style='text-align: center; margin-top: 3rem; color: rgba(255,255,255,0.5); font-size: 12px;'>SafeRoute AI Engine • Île-de-France Sector • v3.1</div>", unsafe_allow_html=True)
+# Limite por sessão (token bucket): só é gasto quando um clique falha a grelha e o cache e precisa do backend;
+# acima dele o clique só é servido por grelha/cache/store
+bucket, batch_bucket = (session_bucket("click"), session_bucket("batch")) if get_predictor().remote else (None, None)
+denied_before = bucket.denied if bucket is not None else 0
+def throttle_notice(since=denied_before, b=bucket):
+    if b is not None and b.denied > since:
+        st.warning(f"Too many requests from this session: showing cached or precomputed results only. Live predictions resume in {b.retry_after():.0f}s.")
+def batch_call(fn, *args, **kw):
+    # Compare/perfil/mapa: gastam o bucket "batch" (um token por cenário enviado ao backend)
+    since = batch_bucket.denied if batch_bucket is not None else 0
+    try: return fn(*args, **kw)
+    finally: throttle_notice(since, batch_bucket)
+
+# --- 5. API ---
+# O pedido corre no executor; o script só espera por ele em fatias curtas, por isso qualquer clique ou mudança
+# de input interrompe a espera (rerun) e o pedido antigo é cancelado ou substituído.
+if mode != "Single scenario" and "pending" in st.session_state:
+    # Saiu do modo cenário único: o pedido em curso deixa de ter onde aparecer
+    st.session_state.pop("pending")["future"].cancel()
+if mode == "Single scenario":
+    with span("param_build"): params = {"department": dept_display_map[s_dept], "day_of_week": s_day, "hour": int(s_hour), "road_category": s_road, "speed_limit": int(s_speed), "surface_condition": s_surf}
+    pending = st.session_state.get("pending")
+    if pending is not None and (pending["key"] != make_key(params) or st.session_state.get("cancel_predict")):
+        pending["future"].cancel(); del st.session_state["pending"]; pending = None
+    if btn and pending is None:
+        pending = st.session_state["pending"] = {"key": make_key(params), "dept": s_dept, "t0": time.monotonic(), "denied": denied_before, "future": get_executor().submit(prediction_job(params, grid_mode, bucket))}
+
+    if pending is not None:
+        ph = st.empty(); status = st.empty()
+        fut, deadline = pending["future"], pending["t0"] + st.secrets.get("PREDICT_TIMEOUT_S", 10) + 2
+        store, stale_after, last_known = get_prediction_store(), st.secrets.get("STALE_AFTER_S", 3), None
+        with status.container():
+            c_wait, c_cancel = st.columns([4, 1])
+            with c_cancel: st.button("Cancel", key="cancel_predict")
+            with c_wait: waiting = st.empty()
+            while not fut.done() and time.monotonic() < deadline:
+                if store is not None and last_known is None and time.monotonic() - pending["t0"] > stale_after:
+                    last_known = store.get(pending["key"]) or False
+                    if last_known: break  # backend lento: serve o último resultado conhecido (o pedido continua e atualiza o store)
+                waiting.markdown(f"<p style='color:white'>Analyzing... {time.monotonic() - pending['t0']:.1f}s</p>", unsafe_allow_html=True)
+                time.sleep(0.15)
+        status.empty(); del st.session_state["pending"]
+
+        res, err, exc, cached = None, None, None, None
+        if fut.done():
+            try: res, err = fut.result()
+            except Exception as e: exc = e
+        else: exc = TimeoutError("no response from the prediction backend")
+        if res is None and store is not None:
+            # Backend inacessível, com erro ou lento: último resultado conhecido, com badge "cached at"
+            cached = last_known or store.get(pending["key"])
+            if cached: res, err, exc = cached["value"], None, None
+        throttle_notice(pending["denied"])
+        # Do clique ao resultado (inclui a espera, mesmo atravessando reruns); a renderização tem o seu próprio span
+        timings.record("predict_total", (time.monotonic() - pending["t0"]) * 1000, error=res is None)
+
+        with span("result_render"):
+            try:
+                if exc is not None: raise exc
+                if err is None:
+                    raw_probs = res.get("probabilities", {})
+                    with span("clean_probs"): clean_probs = clean_probabilities(res)
+
+                    risk = severity_risk(clean_probs)
+                    style = get_risk_style(risk)
+                    txt = SEVERITY_TEXT_MAP.get(res.get("severity_text"), res.get("severity_text"))
+
+                    with ph.container():
+                        # Cartão primeiro; mapa e análise detalhada preenchem-se a seguir
+                        with span("card_render"):
+                            badge = f"<span class='ver-badge' style='float:right'>⚠ cached at {time.strftime('%d/%m %H:%M', time.localtime(cached['updated_at']))} · model {cached['model_version'] or 'unknown'}</span>" if cached else ""
+                            st.markdown(risk_card_html(style, risk, txt, badge), unsafe_allow_html=True)
+                        c_map, c_det = st.columns([2, 1])
+                        with c_map, span("pydeck_build"):
+                            # pydeck só é carregado (dentro de saferoute.maps) quando há resultado para desenhar
+                            coords = dept_coords[pending["dept"]]
+                            st.pydeck_chart(make_deck(point_layer(coords, hex_to_rgb(style['color']) + [160], 2000 + risk * 10000, stroked=False), coords, zoom=10))
+                        with c_det:
+                            st.markdown("<h4 style='color: white; border-bottom: 1px solid rgba(255,255,255,0.3)'>Detailed Analysis</h4>", unsafe_allow_html=True)
+                            for k, v in raw_probs.items():
+                                st.markdown(f"<div style='color:white; display:flex; justify-content:space-between'><span>{k}</span><span>{v}</span></div>", unsafe_allow_html=True)
+                                st.progress(clean_probs[k])
+                else: st.error(f"API Error: {err}")
+            except Exception as e: st.error(f"Connection Failed: {e}")
+
+# --- 6. COMPARAÇÃO DE CENÁRIOS ---
+if btn and batch_mode:
+    dims = {"Department": [dept_display_map[d] for d in s_dept], "Day": s_day, "Hour": [int(h) for h in s_hour], "Road": s_road, "Speed": [int(v) for v in s_speed], "Surface": s_surf}
+    n = int(np.prod([len(v) for v in dims.values()]))
+    if n == 0: st.warning("Select at least one value per parameter.")
+    elif n > MAX_SCENARIOS: st.warning(f"{n} scenarios selected; the limit is {MAX_SCENARIOS}. Narrow the selection.")
+    else:
+        combos = list(itertools.product(*dims.values()))
+        params_list = [{"department": c[0], "day_of_week": c[1], "hour": c[2], "road_category": c[3], "speed_limit": c[4], "surface_condition": c[5]} for c in combos]
+        with st.spinner(f'Analyzing {n} scenarios...'):
+            results = batch_call(fetch_predictions, params_list, use_grid=grid_mode, bucket=batch_bucket)
+        import pandas as pd
+        df_b = pd.DataFrame(combos, columns=list(dims.keys()))
+        df_b["Death + Hospitalized"] = [severity_risk(clean_probabilities(r)) if r is not None else np.nan for r in results]
+        failed = int(df_b["Death + Hospitalized"].isna().sum())
+        if failed: st.error(f"{failed} of {n} scenarios failed. Showing the rest.")
+        varying = [k for k, v in dims.items() if len(v) > 1]
+        with st.container():
+            st.markdown(f"<div class='glass-container'><h4 style='color:#334155; margin:0'>Scenario Comparison</h4><p style='color:#64748b; margin:0'>{n} scenarios · Death + Hospitalized risk</p></div>", unsafe_allow_html=True)
+            if len(varying) >= 2:
+                heat = df_b.pivot_table(index=varying[0], columns=varying[1], values="Death + Hospitalized", aggfunc="mean").reindex(index=dims[varying[0]], columns=dims[varying[1]])
+                st.dataframe(heat.style.format("{:.1%}").map(risk_cell_css), use_container_width=True)
+                if len(varying) > 2: st.caption(f"Cells average over: {', '.join(varying[2:])}")
+            st.dataframe(df_b.sort_values("Death + Hospitalized").style.format({"Death + Hospitalized": "{:.1%}"}).map(risk_cell_css, subset=["Death + Hospitalized"]), use_container_width=True, hide_index=True)
+
+# --- 7. PERFIL TEMPORAL (24H x SEMANA) ---
+if btn and profile_mode:
+    with st.spinner('Building 24h × week profile...'), span("profile_build"):
+        try: matrix, missing = batch_call(risk_profile, dept_display_map[s_dept], s_road, int(s_speed), s_surf, grid_mode, get_predictor().model_version, batch_bucket), 0
+        except ProfileIncomplete as e: matrix, missing = e.matrix, int(np.isnan(e.matrix).sum())
+    if missing == matrix.size: st.error("Connection Failed: no cell of the profile could be scored.")
+    else:
+        import pandas as pd
+        if missing: st.warning(f"{missing} of {matrix.size} cells could not be scored and are left blank.")
+        df_p = pd.DataFrame(matrix, index=days_list, columns=[f"{h:02d}h" for h in hours_list])
+        d, h = np.unravel_index(np.nanargmin(matrix), matrix.shape)
+        st.markdown(f"<div class='glass-container'><h4 style='color:#334155; margin:0'>Risk Profile · {dept_display_map[s_dept]}</h4><p style='color:#64748b; margin:0'>{s_road} · {s_speed} km/h · {s_surf} — safest slot: {days_list[d]} {hours_list[h]:02d}:00 ({matrix[d, h]:.1%})</p></div>", unsafe_allow_html=True)
+        st.dataframe(df_p.style.format("{:.0%}", na_rep="–").map(risk_cell_css), use_container_width=True)
+        st.line_chart(df_p.T, y_label="Death + Hospitalized")
+
+# --- 8. MAPA DOS 8 DEPARTAMENTOS ---
+if btn and map_mode:
+    params_list = [{"department": dept_display_map[d], "day_of_week": s_day, "hour": int(s_hour), "road_category": s_road, "speed_limit": int(s_speed), "surface_condition": s_surf} for d in DEPT_OPTIONS]
+    with st.spinner('Scoring all departments...'):
+        results = batch_call(fetch_predictions, params_list, use_grid=grid_mode, bucket=batch_bucket)
+    ok = [i for i, r in enumerate(results) if r is not None]
+    if not ok: st.error("Connection Failed: no department could be scored.")
+    else:
+        if len(ok) < len(DEPT_OPTIONS): st.warning(f"{len(DEPT_OPTIONS) - len(ok)} department(s) could not be scored.")
+        names = [DEPT_OPTIONS[i] for i in ok]
+        risks = np.array([severity_risk(clean_probabilities(results[i])) for i in ok])
+        with span("pydeck_build"):
+            layer = risk_layer(names, [dept_coords[n] for n in names], risks, risk_colors(risks),
+                               labels=[f"{dept_display_map[n]} · {r:.1%}" for n, r in zip(names, risks)])
+            st.pydeck_chart(make_deck(layer, (48.71, 2.50), zoom=8, tooltip={"text": "{risk}"}))
+
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
@@ -1,8 +1,13 @@
 import streamlit as st
-import requests
-import pandas as pd
-import pydeck as pdk
-import time
+import numpy as np
+from saferoute.config import regions, region_coords
+from saferoute.styles import FRANCE_CSS, FRANCE_NAVBAR_HTML, FRANCE_BADGE_HTML, FRANCE_FOOTER_HTML, report_card_html
+from saferoute.scoring import REGION_RISK_LEVELS, get_risk_style, risk_colors, hex_to_rgb
+from saferoute.resources import get_http_client
+from saferoute.service import fetch_region, fetch_regions
+from saferoute.maps import point_layer, make_deck, risk_layer
+from saferoute.timing import span
+from saferoute.admin import setup_metrics_export, admin_requested, render_admin
 
 # --- 1. CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
@@ -13,101 +18,16 @@ st.set_page_config(
 )
 
 # --- 2. CSS "CANVAS" & UX DESIGN ---
-st.markdown("""
-    <style>
-        /* --- ANIMAÇÃO DE FUNDO (O Efeito Canvas) --- */
-        @keyframes gradient {
-            0% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-            100% { background-position: 0% 50%; }
-        }
-
-        .stApp {
-            /* Fundo Gradiente Animado Moderno */
-            background: linear-gradient(-45deg, #ee7752, #e73c7e, #23a6d5, #23d5ab);
-            background-size: 400% 400%;
-            animation: gradient 15s ease infinite;
-            font-family: 'Inter', sans-serif;
-        }
-
-        /* --- REMOVER ELEMENTOS PADRÃO --- */
-        [data-testid="stSidebar"] { display: none; }
-        #MainMenu { visibility: hidden; }
-        footer { visibility: hidden; }
-        [data-testid="stHeader"] { background-color: rgba(0,0,0,0); } /* Header Transparente */
-
-        /* --- GLASSMORPHISM CONTAINER (O Efeito de Vidro) --- */
-        .glass-container {
-            background: rgba(255, 255, 255, 0.85);
-            backdrop-filter: blur(12px);
-            -webkit-backdrop-filter: blur(12px);
-            border-radius: 20px;
-            border: 1px solid rgba(255, 255, 255, 0.3);
-            padding: 2rem;
-            box-shadow: 0 8px 32px 0 rgba(31, 38, 135, 0.15);
-            margin-bottom: 2rem;
-        }
-
-        /* --- TYPOGRAPHY --- */
-        h1 { color: #1e293b !important; font-weight: 800 !important; letter-spacing: -1px; }
-        h3 { color: #475569 !important; font-weight: 500 !important; }
-        
-        /* --- INPUT STYLING --- */
-        .stSelectbox > div > div {
-            background-color: white !important;
-            border: 2px solid #e2e8f0 !important;
-            border-radius: 12px !important;
-            color: #333 !important;
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        }
-
-        /* --- BOTÃO MODERNIZADO --- */
-        .stButton > button {
-            background: #111827 !important; /* Preto Clean estilo Vercel/Apple */
-            color: white !important;
-            border: none;
-            border-radius: 12px;
-            padding: 0.75rem 2rem;
-            font-weight: 600;
-            width: 100%;
-            transition: all 0.3s ease;
-            box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1);
-        }
-        .stButton > button:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
-            background: #000000 !important;
-        }
-        
-        /* --- METRIC FIX --- */
-        [data-testid="stMetricLabel"] { color: #64748b !important; font-size: 14px !important; }
-        [data-testid="stMetricValue"] { color: #0f172a !important; font-size: 36px !important; font-weight: 700 !important; }
-
-    </style>
-""", unsafe_allow_html=True)
-
-# --- DADOS ---
-regions = [
-    'Île-de-France', 'Nouvelle-Aquitaine', 'Auvergne-Rhône-Alpes',
-    'Occitanie', 'Provence-Alpes-Côte d’Azur', 'Hauts-de-France',
-    'Normandie', 'Pays de la Loire', 'Bourgogne-Franche-Comté',
-    'Grand Est', 'Centre-Val de Loire', 'Bretagne'
-]
-
-region_coords = {
-    'Île-de-France': (48.8566, 2.3522),
-    'Nouvelle-Aquitaine': (44.8378, -0.5792),
-    'Auvergne-Rhône-Alpes': (45.7640, 4.8357),
-    'Occitanie': (43.6045, 1.4442),
-    'Provence-Alpes-Côte d’Azur': (43.2965, 5.3698),
-    'Hauts-de-France': (50.6292, 3.0573),
-    'Normandie': (49.4431, 1.0993),
-    'Pays de la Loire': (47.2184, -1.5536),
-    'Bourgogne-Franche-Comté': (47.3220, 5.0415),
-    'Grand Est': (48.5734, 7.7521),
-    'Centre-Val de Loire': (47.9025, 1.9090),
-    'Bretagne': (48.1173, -1.6778)
-}
+st.markdown(FRANCE_CSS, unsafe_allow_html=True)
+
+PREDICT_URL = st.secrets.get("PREDICT_URL", "https://dummymodel-114787831451.europe-west1.run.app/predict")
+
+setup_metrics_export()
+
+# Página de admin escondida (?admin=<ADMIN_TOKEN>)
+if admin_requested():
+    render_admin(lambda: {"Circuit breaker": {"state": get_http_client("regions").breaker.state, "failures": get_http_client("regions").breaker.failures}})
+    st.stop()
 
 # --- LAYOUT PRINCIPAL (CONTAINER FLUTUANTE) ---
 
@@ -117,9 +37,9 @@ st.markdown("<div class='glass-container'>", unsafe_allow_html=True)
 # Navbar Minimalista dentro do container
 c_logo, c_badge = st.columns([3, 1])
 with c_logo:
-    st.markdown("<div style='font-size: 24px; font-weight: 800; color: #2563EB;'>🛡️ SafeRoute <span style='color: #94a3b8;'>France</span></div>", unsafe_allow_html=True)
+    st.markdown(FRANCE_NAVBAR_HTML, unsafe_allow_html=True)
 with c_badge:
-    st.markdown("<div style='text-align: right; color: #64748b; font-size: 12px; border: 1px solid #cbd5e1; padding: 4px 8px; border-radius: 20px; display: inline-block;'>v2.1 Live</div>", unsafe_allow_html=True)
+    st.markdown(FRANCE_BADGE_HTML, unsafe_allow_html=True)
 
 st.divider()
 
@@ -132,6 +52,7 @@ with col_input_2:
     selected_region = st.selectbox("Select Region", regions, label_visibility="collapsed")
     st.write("") # Spacer
     predict_btn = st.button("Analyze Safety Levels ✨")
+    national_btn = st.button("National Overview 🗺️")
 
 st.markdown("</div>", unsafe_allow_html=True) # Fecha Container de Input
 
@@ -140,44 +61,21 @@ if predict_btn:
     # Placeholder para manter layout enquanto carrega
     result_placeholder = st.empty()
     
-    url = "https://dummymodel-114787831451.europe-west1.run.app/predict"
-    
     with st.spinner('Running AI risk models...'):
         try:
             # time.sleep(1.5) # Descomente para ver a animação de loading
-            response = requests.get(url, params={'region': selected_region}, timeout=8)
+            result, err = fetch_region(PREDICT_URL, selected_region)
             
-            if response.status_code == 200:
-                result = response.json()
+            if err is None:
                 prob = result['probability_of_fatality']
                 coords = region_coords[selected_region]
                 
-                # Lógica de Cores UX
-                if prob < 0.3:
-                    color_hex = "#10B981" # Verde
-                    risk_label = "SAFE"
-                    msg = "Low risk detected."
-                elif prob < 0.7:
-                    color_hex = "#F59E0B" # Laranja
-                    risk_label = "MODERATE"
-                    msg = "Exercise caution."
-                else:
-                    color_hex = "#EF4444" # Vermelho
-                    risk_label = "CRITICAL"
-                    msg = "High danger zone."
+                # Lógica de Cores UX (limiares 0.3 / 0.7 em saferoute.scoring)
+                style = get_risk_style(prob, REGION_RISK_LEVELS)
 
                 # --- NOVO CARD DE RESULTADO ---
-                st.markdown(f"""
-                <div class='glass-container' style='border-left: 8px solid {color_hex};'>
-                    <div style='display: flex; justify-content: space-between; align-items: center;'>
-                        <div>
-                            <h4 style='margin:0; color: #64748b;'>Assessment Report</h4>
-                            <h2 style='margin:0; color: {color_hex};'>{risk_label}</h2>
-                            <p style='margin:0; color: #334155;'>{msg}</p>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+                with span("app2.card_render"):
+                    st.markdown(report_card_html(style["color"], style["label"], style["msg"]), unsafe_allow_html=True)
                 
                 # Layout Métricas + Mapa
                 c_metrics, c_map = st.columns([1, 2])
@@ -190,37 +88,10 @@ if predict_btn:
                         st.markdown(f"**Region:** {result['region']}")
                         st.markdown(f"**Lat/Lon:** {coords[0]:.2f}, {coords[1]:.2f}")
                 
-                with c_map:
+                with c_map, span("app2.pydeck_build"):
                     # Mapa PyDeck refinado
-                    df_map = pd.DataFrame({'lat': [coords[0]], 'lon': [coords[1]]})
-                    
-                    # Converter cor HEX para RGB Array para PyDeck
-                    rgb_color = [int(color_hex[1:3], 16), int(color_hex[3:5], 16), int(color_hex[5:7], 16), 180]
-
-                    layer = pdk.Layer(
-                        "ScatterplotLayer",
-                        df_map,
-                        get_position='[lon, lat]',
-                        get_fill_color=rgb_color,
-                        get_radius=int(30000 + prob * 50000),
-                        pickable=True,
-                        stroked=True,
-                        get_line_color=[255, 255, 255],
-                        line_width_min_pixels=3,
-                        filled=True
-                    )
-
-                    view_state = pdk.ViewState(
-                        latitude=coords[0], longitude=coords[1], zoom=6, pitch=30
-                    )
-
-                    deck = pdk.Deck(
-                        layers=[layer],
-                        initial_view_state=view_state,
-                        map_style=pdk.map_styles.LIGHT,
-                        tooltip={"text": "Risk Level: {prob:.1%}"}
-                    )
-                    st.pydeck_chart(deck)
+                    layer = point_layer(coords, hex_to_rgb(style["color"]) + [180], int(30000 + prob * 50000))
+                    st.pydeck_chart(make_deck(layer, coords, zoom=6, pitch=30, tooltip={"text": "Risk Level: {prob:.1%}"}))
 
             else:
                 st.error("Server Error. Please try again.")
@@ -228,9 +99,25 @@ if predict_btn:
         except Exception as e:
             st.error(f"Connection failed. Details: {e}")
 
+# --- VISÃO NACIONAL (TODAS AS REGIÕES EM PARALELO) ---
+if national_btn:
+    with st.spinner('Scoring all regions...'):
+        results = fetch_regions(PREDICT_URL, regions)
+
+    scored = [(r, res['probability_of_fatality']) for r, res in zip(regions, results) if res is not None and 'probability_of_fatality' in res]
+    failed = len(regions) - len(scored)
+    if not scored:
+        st.error("Connection failed. No region could be scored.")
+    else:
+        if failed: st.warning(f"{failed} region(s) did not respond in time.")
+        names = [r for r, _ in scored]
+        probs = np.array([p for _, p in scored])
+        # Mesmos limiares do cartão (0.3 / 0.7), aplicados de uma vez ao vetor de probabilidades
+        colors = risk_colors(probs, REGION_RISK_LEVELS, alpha=180)
+        with span("app2.pydeck_build"):
+            layer = risk_layer(names, [region_coords[r] for r in names], probs, colors, radius=(30000, 50000),
+                               labels=[f"{r}: {p:.1%}" for r, p in scored])
+            st.pydeck_chart(make_deck(layer, (46.6, 2.4), zoom=4.8, tooltip={"text": "{risk}"}))
+
 # --- FOOTER DISCRETO ---
-st.markdown("""
-<div style="text-align: center; margin-top: 2rem; color: rgba(255,255,255,0.6); font-size: 12px;">
-    SafeRoute AI © 2024
-</div>
-""", unsafe_allow_html=True)
+st.markdown(FRANCE_FOOTER_HTML, unsafe_allow_html=True)
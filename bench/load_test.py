@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+from mock_server import serve
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from saferoute.config import DEPT_OPTIONS, days_list, hours_list, road_cat_list, speed_list, surface_list  # noqa: E402
+
+# Selectboxes de cada app (label -> opções) e o botão que dispara a previsão
+SCENARIOS = {
+    "app.py": {"button": "Calculate Severity Probability", "inputs": {"Department": DEPT_OPTIONS, "Day of Week": days_list, "Time of Day": hours_list,
+                                                                      "Road Category": road_cat_list, "Speed Limit (km/h)": speed_list, "Surface Condition": surface_list}},
+    "app2.py": {"button": "Analyze Safety Levels", "inputs": {"Select Region": None}},
+}
+
+
+def percentile(data, q):
+    return data[min(len(data) - 1, int(q * len(data)))] if data else 0.0
+
+
+def session(app, secrets, clicks, choices, latencies, errors, barrier, seed):
+    from streamlit.testing.v1 import AppTest
+    rnd = random.Random(seed)
+    spec = SCENARIOS[os.path.basename(app)]
+    at = AppTest.from_file(app, default_timeout=60)
+    for k, v in secrets.items(): at.secrets[k] = v
+    at.run()
+    barrier.wait()  # todas as sessões começam a clicar ao mesmo tempo
+    for _ in range(clicks):
+        combo = rnd.choice(choices)
+        for box in at.selectbox:
+            if box.label not in combo: continue
+            box.set_value(combo[box.label] if combo[box.label] is not None else rnd.choice(box.options))
+        button = next(b for b in at.button if b.label.startswith(spec["button"]))
+        t0 = time.perf_counter()
+        button.click().run()
+        latencies.append((time.perf_counter() - t0) * 1000)
+        errors.extend(e.value for e in at.error)
+        errors.extend(str(e.value) for e in at.exception)
+
+
+def run(app, sessions, clicks, distinct, secrets, seed=0):
+    spec = SCENARIOS[os.path.basename(app)]
+    rnd = random.Random(seed)
+    # Opções None: lidas do próprio widget em cada sessão (ex.: regiões do app2.py)
+    choices = [{label: rnd.choice(opts) if opts else None for label, opts in spec["inputs"].items()} for _ in range(distinct)]
+    latencies, errors, barrier = [], [], threading.Barrier(sessions)
+    tracemalloc.start()
+    base_mem = tracemalloc.get_traced_memory()[0]
+    threads = [threading.Thread(target=session, args=(app, secrets, clicks, choices, latencies, errors, barrier, seed + i)) for i in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    lat = sorted(latencies)
+    return {
+        "app": os.path.basename(app), "sessions": sessions, "clicks_per_session": clicks, "distinct_combos": len(choices),
+        "wall_s": wall, "throughput_rps": len(lat) / wall if wall else 0.0,
+        "latency_ms": {"mean": statistics.fmean(lat) if lat else 0.0, "p50": percentile(lat, 0.5), "p95": percentile(lat, 0.95), "p99": percentile(lat, 0.99), "max": lat[-1] if lat else 0.0},
+        "errors": len(errors), "error_samples": sorted(set(errors))[:5],
+        "memory": {"traced_per_session_kb": (current - base_mem) / 1024 / sessions, "traced_peak_kb": peak / 1024,
+                   "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024},
+    }
+
+
+def report(r, before=None):
+    def delta(path):
+        if not before: return ""
+        b = before
+        for k in path: b = b[k]
+        a = r
+        for k in path: a = a[k]
+        return f"  ({a - b:+.1f})"
+    print(f"== {r['app']}: {r['sessions']} sessions x {r['clicks_per_session']} clicks over {r['distinct_combos']} combos")
+    print(f"throughput      {r['throughput_rps']:8.1f} clicks/s{delta(['throughput_rps'])}")
+    for q in ("mean", "p50", "p95", "p99", "max"): print(f"latency {q:<7} {r['latency_ms'][q]:8.1f} ms{delta(['latency_ms', q])}")
+    print(f"backend calls   {r.get('backend_requests', 0):8d}{delta(['backend_requests'])}")
+    print(f"memory/session  {r['memory']['traced_per_session_kb']:8.1f} KiB (peak {r['memory']['traced_peak_kb']:.0f} KiB, rss {r['memory']['max_rss_mb']:.0f} MiB)")
+    print(f"errors          {r['errors']:8d}", *r["error_samples"], sep="\n  " if r["error_samples"] else "")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Carga com N sessões AppTest concorrentes contra o servidor /predict falso")
+    ap.add_argument("--app", default="app.py", choices=sorted(SCENARIOS))
+    ap.add_argument("--sessions", type=int, default=8)
+    ap.add_argument("--clicks", type=int, default=10)
+    ap.add_argument("--distinct", type=int, default=20, help="nº de combinações distintas (tráfego repetido testa o cache)")
+    ap.add_argument("--latency-ms", type=float, default=150)
+    ap.add_argument("--jitter-ms", type=float, default=50)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--secret", action="append", default=[], help="KEY=VALUE extra em st.secrets (ex.: CACHE_MAXSIZE=0 desliga o cache)")
+    ap.add_argument("--json", help="grava o relatório")
+    ap.add_argument("--compare", help="relatório anterior para comparar")
+    a = ap.parse_args()
+
+    server = serve(0, background=True, latency_ms=a.latency_ms, jitter_ms=a.jitter_ms, error_rate=a.error_rate)
+    url = f"http://127.0.0.1:{server.server_port}/predict"
+    secrets = {"API_URL": url, "PREDICT_URL": url}
+    for kv in a.secret:
+        k, _, v = kv.partition("=")
+        secrets[k] = json.loads(v) if v[:1].isdigit() or v in ("true", "false") else v
+    os.chdir(ROOT)
+    r = run(os.path.join(ROOT, a.app), a.sessions, a.clicks, a.distinct, secrets)
+    r["backend_requests"] = server.mock_config.requests
+    server.shutdown()
+    before = None
+    if a.compare:
+        with open(a.compare) as f: before = json.load(f)
+    report(r, before)
+    if a.json:
+        with open(a.json, "w") as f: json.dump(r, f, indent=2)
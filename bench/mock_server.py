@@ -0,0 +1,98 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CLASSES = ("Death", "Hospitalized", "Slightly injured")
+
+
+def fake_probs(key):
+    # Determinístico por combinação de parâmetros, para que caches e grelha sejam comparáveis entre corridas
+    h = hashlib.sha256(key.encode()).digest()
+    w = [1 + h[0] % 12, 8 + h[1] % 40, 60 + h[2] % 60]
+    return [x / sum(w) for x in w]
+
+
+def app_response(params):
+    probs = fake_probs(json.dumps({k: str(v) for k, v in params.items()}, sort_keys=True))
+    return {"probabilities": {c: f"{p * 100:.2f}%" for c, p in zip(CLASSES, probs)}, "severity_text": CLASSES[probs.index(max(probs))]}
+
+
+def app2_response(region):
+    return {"region": region, "probability_of_fatality": round(fake_probs(region)[0] * 5, 4)}
+
+
+class MockConfig:
+    def __init__(self, latency_ms=150.0, jitter_ms=50.0, error_rate=0.0, timeout_rate=0.0, timeout_s=15.0, model_version="mock-1"):
+        self.latency_ms, self.jitter_ms, self.error_rate, self.timeout_rate, self.timeout_s = latency_ms, jitter_ms, error_rate, timeout_rate, timeout_s
+        self.model_version = model_version
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def make_handler(cfg):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, para o pooling do cliente ter efeito
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status); self.send_header("Content-Type", "application/json"); self.send_header("Content-Length", str(len(data))); self.end_headers()
+            self.wfile.write(data)
+
+        def _handle(self, payload=None):
+            with cfg.lock: cfg.requests += 1
+            url = urlparse(self.path)
+            if url.path == "/version": return self._reply(200, {"model_version": cfg.model_version})
+            if url.path not in ("/predict", "/predict/batch"): return self._reply(404, {"detail": "Not Found"})
+            r = random.random()
+            if r < cfg.timeout_rate: time.sleep(cfg.timeout_s)
+            time.sleep(max(0.0, random.gauss(cfg.latency_ms, cfg.jitter_ms)) / 1000)
+            if r < cfg.timeout_rate + cfg.error_rate: return self._reply(503, {"detail": "mock failure"})
+            if url.path == "/predict/batch":
+                return self._reply(200, {"predictions": [{**app_response(p), "model_version": cfg.model_version} for p in (payload or {}).get("instances", [])]})
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            self._reply(200, app2_response(q["region"]) if "region" in q else {**app_response(q), "model_version": cfg.model_version})
+
+        def do_GET(self):
+            self._handle()
+
+        def do_POST(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(n) if n else b""
+            try: payload = json.loads(raw) if raw else None
+            except ValueError: payload = None
+            self._handle(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8000, host="127.0.0.1", background=False, **kw):
+    cfg = MockConfig(**kw)
+    server = ThreadingHTTPServer((host, port), make_handler(cfg))
+    server.daemon_threads = True
+    server.mock_config = cfg
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True, name="mock-predict").start()
+    else:
+        print(f"mock /predict on http://{host}:{server.server_port}/predict (latency {cfg.latency_ms}ms, errors {cfg.error_rate:.0%})")
+        server.serve_forever()
+    return server
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Servidor /predict falso com latência e taxa de erros configuráveis")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--latency-ms", type=float, default=150)
+    ap.add_argument("--jitter-ms", type=float, default=50)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--timeout-rate", type=float, default=0.0)
+    ap.add_argument("--model-version", default="mock-1", help="versão devolvida em /version e nas respostas (ex.: para testar canary)")
+    a = ap.parse_args()
+    serve(a.port, latency_ms=a.latency_ms, jitter_ms=a.jitter_ms, error_rate=a.error_rate, timeout_rate=a.timeout_rate, model_version=a.model_version)
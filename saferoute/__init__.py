@@ -0,0 +1,5 @@
+"""SafeRoute: camada partilhada pelas duas páginas (app.py e app2.py).
+
+Configuração, cliente HTTP e predictors, cache/grelha/store, limiares de risco (scoring),
+construtores de mapas e estilos. As páginas importam daqui e só tratam do layout.
+"""
@@ -0,0 +1,31 @@
+import streamlit as st
+
+from .timing import timings
+
+
+@st.cache_resource
+def setup_metrics_export():
+    # Uma vez por processo: JSONL local e/ou endpoint Prometheus (texto) em /metrics
+    path, port = st.secrets.get("METRICS_JSONL"), st.secrets.get("METRICS_PORT")
+    if path: timings.export_jsonl(path)
+    return timings.serve_prometheus(port) if port else None
+
+
+def admin_requested():
+    # Página escondida: ?admin=<ADMIN_TOKEN>; sem token configurado fica desativada
+    token = st.secrets.get("ADMIN_TOKEN")
+    return bool(token) and st.query_params.get("admin") == token
+
+
+def render_admin(extra=None):
+    st.markdown("<div class='glass-container'><h4 style='margin:0; color:#334155'>Latency Dashboard</h4><p style='margin:0; color:#64748b'>Rolling per-stage percentiles for this process</p></div>", unsafe_allow_html=True)
+    if st.button("Reset samples"): timings.reset()
+
+    @st.fragment(run_every=2)
+    def live():
+        rows = timings.snapshot()
+        if rows: st.dataframe(rows, use_container_width=True, hide_index=True, column_config={k: st.column_config.NumberColumn(format="%.2f") for k in ("mean_ms", "p50_ms", "p95_ms", "p99_ms")})
+        else: st.info("No samples recorded yet.")
+        for name, stats in (extra() if extra else {}).items():
+            st.markdown(f"**{name}**"); st.json(stats, expanded=False)
+    live()
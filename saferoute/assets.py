@@ -0,0 +1,79 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+
+from .config import ROOT
+
+SOURCE = os.path.join(ROOT, "image_0.png")
+ASSET_DIR = os.path.join(ROOT, "assets")
+DISPLAY_WIDTH = 260
+
+
+def _paths(width, fmt):
+    base = os.path.join(ASSET_DIR, f"logo_{width}")
+    return f"{base}.{fmt.lower()}", f"{base}.json"
+
+
+def source_hash(src=SOURCE):
+    h = hashlib.sha256()
+    with open(src, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""): h.update(chunk)
+    return h.hexdigest()
+
+
+def make_transparent(img, threshold=240):
+    # Branco -> alfa 0, vetorizado e sem transposições: um único array RGBA editado no lugar
+    import numpy as np
+    from PIL import Image
+    data = np.array(img.convert("RGBA"))
+    data[..., 3][(data[..., :3] > threshold).all(axis=-1)] = 0
+    return Image.fromarray(data)
+
+
+def render_logo(src=SOURCE, width=DISPLAY_WIDTH, fmt="PNG"):
+    from PIL import Image
+    with Image.open(src) as img:
+        img = img.convert("RGBA")
+        if img.width > width: img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    buf = io.BytesIO()
+    make_transparent(img).save(buf, format=fmt, **({"optimize": True} if fmt.upper() == "PNG" else {"quality": 90, "method": 6}))
+    return buf.getvalue()
+
+
+def build_logo(src=SOURCE, width=DISPLAY_WIDTH, fmt="PNG", force=False):
+    """Gera assets/logo_<width>.<fmt> se a fonte mudou (hash sha256); devolve (caminho, regenerado?)."""
+    out, meta_path = _paths(width, fmt)
+    digest = source_hash(src)
+    if not force and os.path.exists(out):
+        try:
+            with open(meta_path) as f:
+                if json.load(f).get("source_sha256") == digest: return out, False
+        except (OSError, ValueError): pass
+    data = render_logo(src, width, fmt)
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f: f.write(data)
+    os.replace(tmp, out)
+    with open(meta_path, "w") as f: json.dump({"source_sha256": digest, "width": width, "format": fmt}, f)
+    return out, True
+
+
+def logo_bytes(src=SOURCE, width=DISPLAY_WIDTH, fmt="PNG"):
+    # Caminho de runtime: bytes do ficheiro pré-processado; só regenera (PIL/NumPy) se faltar ou estiver desatualizado
+    try:
+        out, _ = build_logo(src, width, fmt)
+        with open(out, "rb") as f: return f.read()
+    except OSError:
+        return render_logo(src, width, fmt)  # diretório só de leitura: processa em memória
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Pré-processa o logo transparente à largura de exibição")
+    ap.add_argument("--width", type=int, default=DISPLAY_WIDTH)
+    ap.add_argument("--format", default="PNG", choices=["PNG", "WEBP"])
+    ap.add_argument("--force", action="store_true")
+    a = ap.parse_args()
+    path, rebuilt = build_logo(width=a.width, fmt=a.format, force=a.force)
+    print(f"{path} {'regenerated' if rebuilt else 'up to date'} ({os.path.getsize(path)} bytes)")
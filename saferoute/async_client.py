@@ -0,0 +1,24 @@
+import asyncio
+
+import httpx
+
+
+async def _fetch_all(url, params_list, concurrency, deadline):
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=deadline, limits=limits) as client:
+        async def one(params):
+            async with sem:
+                try:
+                    # Prazo por pedido: um pedido lento não atrasa os outros além de `deadline`
+                    resp = await asyncio.wait_for(client.get(url, params=params), deadline)
+                    return resp.json() if resp.status_code == 200 else None
+                except (httpx.HTTPError, asyncio.TimeoutError, ValueError):
+                    return None
+        return await asyncio.gather(*(one(p) for p in params_list))
+
+
+def fetch_all(url, params_list, concurrency=12, deadline=8.0):
+    """GET concorrente de todos os `params_list`; devolve os JSON pela mesma ordem (None nas falhas)."""
+    if not params_list: return []
+    return asyncio.run(_fetch_all(url, params_list, max(1, int(concurrency)), float(deadline)))
@@ -0,0 +1,104 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Ordem fixa dos seis parâmetros do incidente -> chave normalizada
+PARAM_KEYS = ("department", "day_of_week", "hour", "road_category", "speed_limit", "surface_condition")
+INT_KEYS = ("hour", "speed_limit")
+
+
+def make_key(params, model_version=None):
+    # Com versão do modelo, um rollout muda todas as chaves e as entradas antigas deixam de ser servidas (expiram por LRU/TTL)
+    key = tuple(int(params[k]) if k in INT_KEYS else str(params[k]).strip() for k in PARAM_KEYS)
+    return key if model_version is None else key + (str(model_version),)
+
+
+class PredictionCache:
+    """LRU + TTL em memória, com camada opcional em SQLite que sobrevive a reinícios. maxsize <= 0 desliga o cache (ttl <= 0 = nunca expira)."""
+
+    TRIM_EVERY = 256  # nº de escritas entre limpezas da camada em disco
+
+    def __init__(self, maxsize=4096, ttl=3600.0, disk_path=None, disk_maxsize=None):
+        self.maxsize, self.ttl, self.disk_path = int(maxsize), float(ttl), disk_path
+        self.disk_maxsize = int(disk_maxsize) if disk_maxsize is not None else 4 * self.maxsize
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.disk_hits = self.evictions = self.disk_evictions = 0
+        self._db, self._writes = None, 0
+        self.enabled = self.maxsize > 0
+        if disk_path and self.enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, value TEXT NOT NULL, ts REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS predictions_ts ON predictions (ts)")
+            with self._lock: self._trim_disk()
+
+    def _trim_disk(self):
+        # Apaga as linhas expiradas e, acima de disk_maxsize, as mais antigas (inclui as de versões de modelo já substituídas)
+        cur = self._db.execute("DELETE FROM predictions WHERE ? > 0 AND ts < ?", (self.ttl, time.time() - self.ttl))
+        n = cur.rowcount
+        cur = self._db.execute("DELETE FROM predictions WHERE ts <= (SELECT ts FROM predictions ORDER BY ts DESC LIMIT 1 OFFSET ?)", (self.disk_maxsize,))
+        self.disk_evictions += n + max(cur.rowcount, 0)
+        self._db.commit()
+
+    def _fresh(self, ts):
+        return self.ttl <= 0 or (time.time() - ts) < self.ttl
+
+    def _put_mem(self, key, value, ts):
+        self._mem[key] = (value, ts)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        if not self.enabled:
+            with self._lock: self.misses += 1
+            return None
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                if self._fresh(item[1]):
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    return item[0]
+                del self._mem[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value, ts FROM predictions WHERE key = ?", (json.dumps(key),)).fetchone()
+                if row and self._fresh(row[1]):
+                    value = json.loads(row[0])
+                    self._put_mem(key, value, row[1])
+                    self.hits += 1; self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        # items: (chave, valor); na camada em disco, um só executemany + commit por lote
+        if not self.enabled or not items: return
+        ts = time.time()
+        with self._lock:
+            for key, value in items: self._put_mem(key, value, ts)
+            if self._db is not None:
+                self._db.executemany("INSERT OR REPLACE INTO predictions (key, value, ts) VALUES (?, ?, ?)", [(json.dumps(key), json.dumps(value), ts) for key, value in items])
+                self._db.commit()
+                before, self._writes = self._writes, self._writes + len(items)
+                if self._writes // self.TRIM_EVERY > before // self.TRIM_EVERY: self._trim_disk()
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions"); self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"size": len(self._mem), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses, "disk_hits": self.disk_hits,
+                    "evictions": self.evictions, "disk_evictions": self.disk_evictions, "hit_rate": (self.hits / total) if total else 0.0}
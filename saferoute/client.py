@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .limits import BUSY_MSG
+from .timing import span
+
+
+def post_predict(api_url, params, timeout=10, client=None, gate=None):
+    # (resposta, None) em caso de sucesso, (None, texto do erro) caso contrário; (None, BUSY_MSG) se o gate não deu vaga
+    if gate is not None and not gate.acquire(): return None, BUSY_MSG
+    try:
+        with span("http_call"): resp = (client or requests).post(api_url, params=params, timeout=timeout)
+    finally:
+        if gate is not None: gate.release()
+    if resp.status_code != 200: return None, resp.text
+    with span("json_parse"): return resp.json(), None
+
+
+def post_batch(batch_url, params_list, timeout=30, client=None, gate=None):
+    # Um único pedido com todos os cenários (ocupa uma vaga do gate); None se o backend não suportar batching ou estiver saturado
+    if gate is not None and not gate.acquire(): return None
+    try:
+        resp = (client or requests).post(batch_url, json={"instances": params_list}, timeout=timeout)
+        if resp.status_code != 200: return None
+        data = resp.json()
+    except (requests.RequestException, ValueError):
+        return None
+    finally:
+        if gate is not None: gate.release()
+    results = data.get("predictions") if isinstance(data, dict) else data
+    return results if isinstance(results, list) and len(results) == len(params_list) else None
+
+
+def fan_out(api_url, params_list, max_workers=8, timeout=10, client=None, gate=None):
+    # Alternativa sem endpoint batch: concorrência limitada (e cada pedido conta no gate global), None nas falhas
+    def one(params):
+        try: return post_predict(api_url, params, timeout, client, gate)[0]
+        except (requests.RequestException, ValueError): return None
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(params_list)))) as pool:
+        return list(pool.map(one, params_list))
+
+
+def version_url_for(api_url):
+    # /version ao lado de /predict
+    return (api_url[:-len("/predict")] if api_url.endswith("/predict") else api_url.rstrip("/")) + "/version"
+
+
+def get_version(version_url, timeout=2, client=None):
+    # Versão do modelo servido ({"model_version": ...} ou {"version": ...}); None se o backend não a expõe
+    try:
+        resp = (client or requests).get(version_url, timeout=timeout)
+        if resp.status_code != 200: return None
+        data = resp.json()
+    except (requests.RequestException, ValueError):
+        return None
+    v = data.get("model_version") or data.get("version") if isinstance(data, dict) else None
+    return str(v) if v else None
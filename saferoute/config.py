@@ -0,0 +1,40 @@
+# Configuração estática, importada uma vez por processo (não é reconstruída a cada rerun do Streamlit)
+import os
+
+# Raiz do repositório: assets, modelos, grelha e dados ficam ao lado das apps
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- ESPAÇO DE ENTRADA (partilhado pela app e pelo job da grelha) ---
+dept_coords = {'Paris': (48.8566, 2.3522), 'Seine-et-Marne': (48.8411, 2.9994), 'Yvelines': (48.8049, 1.9090), 'Essonne': (48.5228, 2.2285), 'Hauts-de-Seine': (48.8306, 2.2215), 'Seine-Saint-Denis': (48.9112, 2.4699), 'Val-de-Marne': (48.7775, 2.4571), "Val-d'Oise": (49.0560, 2.1467)}
+dept_display_map = {'Paris': '75 (Paris)', 'Seine-et-Marne': '77 (Seine-et-Marne)', 'Yvelines': '78 (Yvelines)', 'Essonne': '91 (Essonne)', 'Hauts-de-Seine': '92 (Hauts-de-Seine)', 'Seine-Saint-Denis': '93 (Seine-Saint-Denis)', 'Val-de-Marne': '94 (Val-de-Marne)', "Val-d'Oise": "95 (Val-d'Oise)"}
+days_list, hours_list = ['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'], list(range(24))
+surface_list, road_cat_list = ['Normal','Wet / Slippery'], ['Major Roads','Secondary Roads','Local & Access Roads','Other / Off-Network']
+speed_list = [10,20,30,40,50,60,70,80,90,100,110,130]
+DEPT_OPTIONS = list(dept_coords.keys())
+MAX_SCENARIOS = 2000
+
+# --- TEXTOS ---
+SEVERITY_TEXT_MAP = {"2": "Fatality (High Danger)", "3": "Hospitalized (Severe)", "4": "Slightly Injured (Minor)", 2: "Fatality (High Danger)", 3: "Hospitalized (Severe)", 4: "Slightly Injured (Minor)", "Death": "Fatality (High Danger)", "Hospitalized": "Hospitalized (Severe)", "Slightly injured": "Slightly Injured (Minor)"}
+
+# --- REGIÕES DE FRANÇA (app2.py) ---
+regions = [
+    'Île-de-France', 'Nouvelle-Aquitaine', 'Auvergne-Rhône-Alpes',
+    'Occitanie', 'Provence-Alpes-Côte d’Azur', 'Hauts-de-France',
+    'Normandie', 'Pays de la Loire', 'Bourgogne-Franche-Comté',
+    'Grand Est', 'Centre-Val de Loire', 'Bretagne'
+]
+
+region_coords = {
+    'Île-de-France': (48.8566, 2.3522),
+    'Nouvelle-Aquitaine': (44.8378, -0.5792),
+    'Auvergne-Rhône-Alpes': (45.7640, 4.8357),
+    'Occitanie': (43.6045, 1.4442),
+    'Provence-Alpes-Côte d’Azur': (43.2965, 5.3698),
+    'Hauts-de-France': (50.6292, 3.0573),
+    'Normandie': (49.4431, 1.0993),
+    'Pays de la Loire': (47.2184, -1.5536),
+    'Bourgogne-Franche-Comté': (47.3220, 5.0415),
+    'Grand Est': (48.5734, 7.7521),
+    'Centre-Val de Loire': (47.9025, 1.9090),
+    'Bretagne': (48.1173, -1.6778)
+}
@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from .config import ROOT, dept_coords, dept_display_map, days_list, hours_list, road_cat_list, speed_list, surface_list
+from .cache import PARAM_KEYS
+from .client import get_version, version_url_for
+
+# Eixos da grelha, na ordem de PARAM_KEYS: 8 x 7 x 24 x 4 x 12 x 2 = 129 024 células
+AXES = ([dept_display_map[d] for d in dept_coords], days_list, hours_list, road_cat_list, speed_list, surface_list)
+SHAPE = tuple(len(a) for a in AXES)
+_INDEX = [{v: i for i, v in enumerate(a)} for a in AXES]
+DEFAULT_DIR = os.path.join(ROOT, "risk_grid")
+
+
+def cell_index(params):
+    try: return tuple(_INDEX[i][int(params[k]) if k in ("hour", "speed_limit") else params[k]] for i, k in enumerate(PARAM_KEYS))
+    except (KeyError, ValueError): return None
+
+
+def cell_params(idx):
+    return {k: AXES[i][j] for i, (k, j) in enumerate(zip(PARAM_KEYS, idx))}
+
+
+class RiskGrid:
+    """Tabela colunar pré-calculada (probs.npy / severity.npy + meta.json), lida por memory-map."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as f: self.meta = json.load(f)
+        self.version, self.classes, self.labels = self.meta["version"], self.meta["classes"], self.meta["labels"]
+        self.probs = np.load(os.path.join(path, "probs.npy"), mmap_mode="r")
+        self.severity = np.load(os.path.join(path, "severity.npy"), mmap_mode="r")
+
+    @classmethod
+    def load(cls, path=DEFAULT_DIR):
+        try: return cls(path)
+        except (OSError, KeyError, ValueError): return None
+
+    def coverage(self):
+        return float((np.asarray(self.severity) >= 0).mean())
+
+    def lookup(self, params, version=None):
+        # None -> célula em falta ou grelha de outra versão do modelo (version = a versão que o backend serve agora): a app usa a API
+        if version and version != self.version: return None
+        idx = cell_index(params)
+        if idx is None or self.severity[idx] < 0: return None
+        row = self.probs[idx]
+        return {"probabilities": {c: f"{row[i] * 100:.2f}%" for i, c in enumerate(self.classes)}, "severity_text": self.labels[int(self.severity[idx])]}
+
+
+# --- JOB OFFLINE ---
+def _save(out_dir, probs, severity, meta):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, arr in (("probs", probs), ("severity", severity)):
+        tmp = os.path.join(out_dir, f"{name}.tmp.npy"); np.save(tmp, arr); os.replace(tmp, os.path.join(out_dir, f"{name}.npy"))
+    tmp = os.path.join(out_dir, "meta.tmp.json")
+    with open(tmp, "w") as f: json.dump(meta, f)
+    os.replace(tmp, os.path.join(out_dir, "meta.json"))
+
+
+def build_grid(api_url, out_dir=DEFAULT_DIR, version=None, workers=16, batch_size=1024, timeout=10):
+    local = threading.local()
+    # Por omissão a grelha fica com a versão do modelo servido, para que um rollout a torne obsoleta sozinho
+    if version is None:
+        version = get_version(version_url_for(api_url)) or "v1"
+        print(f"model version: {version}")
+
+    def score(idx):
+        if not hasattr(local, "session"): local.session = requests.Session()
+        try:
+            resp = local.session.post(api_url, params=cell_params(idx), timeout=timeout)
+            return idx, (resp.json() if resp.status_code == 200 else None)
+        except (requests.RequestException, ValueError): return idx, None
+
+    # Retoma uma grelha parcial da mesma versão
+    old = RiskGrid.load(out_dir)
+    if old is not None and old.version == version:
+        meta, probs, severity = old.meta, np.array(old.probs), np.array(old.severity)
+    else:
+        meta, probs, severity = {"version": version, "classes": None, "labels": [], "axes": [list(a) for a in AXES]}, None, np.full(SHAPE, -1, dtype=np.int8)
+    todo = [idx for idx in np.ndindex(SHAPE) if severity[idx] < 0]
+    print(f"{len(todo)} / {severity.size} cells to score")
+
+    t0, failed = time.time(), 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(todo), batch_size):
+            for idx, res in pool.map(score, todo[start:start + batch_size]):
+                if not res: failed += 1; continue
+                raw = res.get("probabilities", {})
+                if meta["classes"] is None:
+                    meta["classes"] = list(raw.keys()); probs = np.zeros(SHAPE + (len(raw),), dtype=np.float32)
+                probs[idx] = [float(str(raw.get(c, "0")).strip('%')) / 100 for c in meta["classes"]]
+                label = res.get("severity_text")
+                if label not in meta["labels"]: meta["labels"].append(label)
+                severity[idx] = meta["labels"].index(label)
+            if probs is not None:
+                meta["built_at"] = time.time(); _save(out_dir, probs, severity, meta)
+            print(f"{min(start + batch_size, len(todo))}/{len(todo)} cells, {failed} failed, {time.time() - t0:.0f}s")
+    return failed
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Pré-calcula a grelha de risco completa via API /predict")
+    ap.add_argument("--api-url", default="http://127.0.0.1:8000/predict")
+    ap.add_argument("--out", default=DEFAULT_DIR)
+    ap.add_argument("--version", help="por omissão, a versão devolvida por /version (ou v1)")
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--batch-size", type=int, default=1024)
+    a = ap.parse_args()
+    build_grid(a.api_url, a.out, a.version, a.workers, a.batch_size)
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    """Abre após `threshold` falhas seguidas; após `reset_after` segundos deixa passar um pedido de teste."""
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold, self.reset_after = int(threshold), float(reset_after)
+        self.failures, self.opened_at = 0, None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None: return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def before(self):
+        with self._lock:
+            if self.state == "open": raise CircuitOpenError(f"Prediction backend unavailable (circuit open, retry in {self.reset_after - (time.monotonic() - self.opened_at):.0f}s)")
+            if self.state == "half-open": self.opened_at = time.monotonic()  # um só pedido de teste por janela
+
+    def success(self):
+        with self._lock: self.failures, self.opened_at = 0, None
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold: self.opened_at = time.monotonic()
+
+
+class PooledClient:
+    """requests.Session keep-alive partilhada, com retries (5xx/timeouts, backoff) e circuit breaker."""
+
+    def __init__(self, pool_size=20, retries=2, backoff=0.3, breaker_threshold=5, breaker_reset=30.0, connect_timeout=3.05):
+        # Só se repetem falhas de ligação e respostas 5xx; um timeout de leitura não (read=0), senão um pedido
+        # pendurado ocuparia thread e vaga do gate por (retries + 1) x timeout
+        retry = Retry(total=retries, connect=retries, read=0, status=retries, backoff_factor=backoff,
+                      status_forcelist=(500, 502, 503, 504), allowed_methods=None, raise_on_status=False)
+        self.connect_timeout = float(connect_timeout)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter); self.session.mount("https://", adapter)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+
+    def request(self, method, url, **kw):
+        # timeout único -> (ligação curta, leitura): as tentativas de ligação repetidas não multiplicam o prazo total
+        t = kw.get("timeout")
+        if isinstance(t, (int, float)): kw["timeout"] = (min(self.connect_timeout, t), t)
+        self.breaker.before()
+        try:
+            resp = self.session.request(method, url, **kw)
+        except requests.RequestException:
+            self.breaker.failure(); raise
+        if resp.status_code >= 500: self.breaker.failure()
+        else: self.breaker.success()
+        return resp
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_client(**kw):
+    # Cliente por processo para quem não passa um explicitamente (ex.: job da grelha)
+    global _default
+    with _default_lock:
+        if _default is None: _default = PooledClient(**kw)
+        return _default
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from .timing import StageStats, timings
+
+BUSY_MSG = "Prediction backend is busy. Please try again in a moment."
+
+
+class TokenBucket:
+    """Limite por sessão: `rate` pedidos por segundo em regime, com rajadas até `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate, self.burst = float(rate), float(burst)
+        self.tokens, self.updated_at = self.burst, time.monotonic()
+        self.denied = 0  # a página compara antes/depois para saber se deve avisar o utilizador
+        self._lock = threading.Lock()  # take() corre no executor, não no thread do script
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def take(self, n=1):
+        with self._lock:
+            self._refill()
+            if self.tokens < n: self.denied += 1; return False
+            self.tokens -= n
+            return True
+
+    def take_up_to(self, n):
+        # Pedidos em lote: concede até n tokens (os que houver) e devolve quantos; o resto conta como recusado
+        with self._lock:
+            self._refill()
+            granted = min(int(n), int(self.tokens))
+            self.tokens -= granted
+            if granted < n: self.denied += 1
+            return granted
+
+    def retry_after(self, n=1):
+        with self._lock: self._refill()
+        return max(0.0, (n - self.tokens) / self.rate) if self.rate > 0 else float("inf")
+
+
+class AdmissionGate:
+    """Limite global de chamadas simultâneas ao backend, com fila de espera limitada a `max_wait` segundos."""
+
+    def __init__(self, max_concurrent=8, max_wait=2.0):
+        self.max_concurrent, self.max_wait = int(max_concurrent), float(max_wait)
+        self._sem = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self.admitted = self.queued = self.rejected = self.throttled = 0
+        self.in_flight = self.waiting = self.peak_in_flight = self.peak_waiting = 0
+        self.wait = StageStats(1024)
+
+    def acquire(self):
+        # True se há vaga (logo ou após esperar); False se a espera esgotou e o pedido deve ser degradado
+        if self._sem.acquire(blocking=False):
+            with self._lock: self.admitted += 1; self._enter()
+            return True
+        with self._lock: self.waiting += 1; self.peak_waiting = max(self.peak_waiting, self.waiting)
+        t0 = time.perf_counter()
+        ok = self._sem.acquire(timeout=self.max_wait)
+        ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.waiting -= 1
+            if ok: self.queued += 1; self._enter()
+            else: self.rejected += 1
+            self.wait.add(ms, error=not ok)
+        timings.record("admission_wait", ms, error=not ok)
+        return ok
+
+    def _enter(self):
+        self.in_flight += 1; self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def release(self):
+        with self._lock: self.in_flight -= 1
+        self._sem.release()
+
+    def note_throttled(self):
+        # Clique recusado pelo limite da sessão (não chegou a pedir vaga)
+        with self._lock: self.throttled += 1
+
+    def stats(self):
+        with self._lock:
+            q = self.wait.quantiles()
+            return {"max_concurrent": self.max_concurrent, "max_wait_s": self.max_wait, "in_flight": self.in_flight, "waiting": self.waiting,
+                    "peak_in_flight": self.peak_in_flight, "peak_waiting": self.peak_waiting, "admitted": self.admitted, "queued": self.queued,
+                    "rejected": self.rejected, "throttled": self.throttled, "queue_wait_p50_ms": q[0.5], "queue_wait_p95_ms": q[0.95]}
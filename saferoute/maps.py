@@ -0,0 +1,19 @@
+def point_layer(coords, rgba, radius, line_width=3, stroked=True):
+    # Um único ponto (cenário escolhido), usado pelo cartão de resultado das duas apps
+    import pydeck as pdk
+    return pdk.Layer("ScatterplotLayer", [{"lat": coords[0], "lon": coords[1]}], get_position='[lon, lat]', get_fill_color=rgba, get_radius=radius, pickable=True,
+                     stroked=stroked, filled=True, get_line_color=[255, 255, 255], line_width_min_pixels=line_width)
+
+
+def make_deck(layer, center, zoom, pitch=0, tooltip=None):
+    import pydeck as pdk
+    return pdk.Deck(layers=[layer], initial_view_state=pdk.ViewState(latitude=center[0], longitude=center[1], zoom=zoom, pitch=pitch), map_style=pdk.map_styles.LIGHT, tooltip=tooltip)
+
+
+def risk_layer(names, coords, risks, colors, radius=(2000, 10000), labels=None):
+    """Uma única ScatterplotLayer para todos os departamentos/regiões (raio e cor pelo risco); desenhar com make_deck."""
+    import pydeck as pdk
+    labels = labels or [f"{r:.1%}" for r in risks]
+    data = [{"name": n, "risk": labels[i], "lat": coords[i][0], "lon": coords[i][1], "color": colors[i].tolist(), "radius": radius[0] + float(risks[i]) * radius[1]} for i, n in enumerate(names)]
+    return pdk.Layer("ScatterplotLayer", data, get_position='[lon, lat]', get_fill_color='color', get_radius='radius', pickable=True, stroked=True, filled=True,
+                     get_line_color=[255, 255, 255], line_width_min_pixels=2)
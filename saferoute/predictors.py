@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+import requests
+
+from .client import post_predict, post_batch, fan_out, get_version, version_url_for
+from .grid import AXES, SHAPE, cell_index
+from .cache import PARAM_KEYS, make_key
+from .config import ROOT
+from .timing import StageStats, timings
+
+DEFAULT_MODEL_PATH = os.path.join(ROOT, "models", "stub_model.json")
+
+
+class Predictor:
+    """Interface comum: devolve respostas no formato da API /predict (probabilidades em '%')."""
+    cacheable = True
+    remote = True  # chamadas de rede: passam pelo limite global de concorrência
+    model_version = None
+
+    def predict(self, params):
+        raise NotImplementedError
+
+    def version_for(self, params):
+        # Versão do modelo que responde a estes parâmetros (entra na chave do cache)
+        return self.model_version
+
+    def predict_many(self, params_list):
+        out = []
+        for params in params_list:
+            try: out.append(self.predict(params)[0])
+            except (requests.RequestException, ValueError): out.append(None)
+        return out
+
+
+class HttpPredictor(Predictor):
+    def __init__(self, api_url, batch_url=None, max_workers=8, timeout=10, client=None, version_url=None, version_ttl=60.0, gate=None):
+        self.api_url, self.batch_url, self.max_workers, self.timeout, self.client = api_url, batch_url, max_workers, timeout, client
+        self.gate = gate  # AdmissionGate partilhado: cada pedido HTTP de previsão ocupa uma vaga
+        # Um fan-out (Compare, perfil, refresher) nunca ocupa mais de metade das vagas: o resto fica para os cliques individuais
+        self.fan_out_workers = min(int(max_workers), max(1, gate.max_concurrent // 2)) if gate is not None else max_workers
+        self.version_url = version_url or version_url_for(api_url)
+        self.version_ttl, self._version, self._probed_at = float(version_ttl), None, None
+        self._probing = threading.Lock()
+
+    @property
+    def model_version(self):
+        # Versão vista na última resposta ou sondada em /version. Só lê o valor guardado: se estiver velho
+        # (version_ttl), a sondagem corre num thread à parte e o script do Streamlit nunca espera pela rede
+        now = time.monotonic()
+        if (self._probed_at is None or now - self._probed_at >= self.version_ttl) and self._probing.acquire(blocking=False):
+            self._probed_at = now
+            threading.Thread(target=self._probe, daemon=True, name="version-probe").start()
+        return self._version
+
+    def _probe(self):
+        try: self._version = get_version(self.version_url, client=self.client) or self._version
+        finally: self._probing.release()
+
+    def _seen(self, res):
+        if isinstance(res, dict) and res.get("model_version"): self._version = str(res["model_version"])
+
+    def predict(self, params):
+        res, err = post_predict(self.api_url, params, self.timeout, self.client, self.gate)
+        self._seen(res)
+        return res, err
+
+    def predict_many(self, params_list):
+        results = post_batch(self.batch_url, params_list, client=self.client, gate=self.gate) if self.batch_url else None
+        if results is None: results = fan_out(self.api_url, params_list, self.fan_out_workers, self.timeout, self.client, self.gate)
+        for res in results: self._seen(res)
+        return results
+
+
+class RoutedPredictor(Predictor):
+    """Divide o tráfego entre backends por peso (canary), com latência e erros por backend.
+
+    A escolha é determinística por chave (hash), por isso os mesmos parâmetros vão sempre ao mesmo backend
+    e a versão que entra na chave do cache é a desse backend.
+    """
+
+    def __init__(self, backends):
+        total = float(sum(w for _, _, w in backends)) or 1.0
+        self.names, self.predictors = [n for n, _, _ in backends], [p for _, p, _ in backends]
+        self.weights = [w / total for _, _, w in backends]
+        self.bounds = np.cumsum(self.weights)[:-1]
+        self.cacheable, self.remote = all(p.cacheable for p in self.predictors), any(p.remote for p in self.predictors)
+        self.latency = {n: StageStats(1024) for n in self.names}
+        self._lock = threading.Lock()
+
+    @property
+    def model_version(self):
+        # Impressão digital de todos os backends: muda quando qualquer um deles faz rollout
+        return "|".join(str(p.model_version) for p in self.predictors)
+
+    def _pick(self, params):
+        h = zlib.crc32(json.dumps(make_key(params)).encode()) / 2 ** 32
+        return int(np.searchsorted(self.bounds, h, side="right"))
+
+    def version_for(self, params):
+        return self.predictors[self._pick(params)].version_for(params)
+
+    def _record(self, i, ms, errors, n=1):
+        name = self.names[i]
+        with self._lock:
+            for k in range(n): self.latency[name].add(ms, error=k < errors)
+        timings.record(f"backend.{name}", ms, error=errors > 0)
+
+    def predict(self, params):
+        i = self._pick(params); t0 = time.perf_counter()
+        try: res, err = self.predictors[i].predict(params)
+        except Exception:
+            self._record(i, (time.perf_counter() - t0) * 1000, 1); raise
+        self._record(i, (time.perf_counter() - t0) * 1000, int(err is not None))
+        return res, err
+
+    def predict_many(self, params_list):
+        groups = {}
+        for j, params in enumerate(params_list): groups.setdefault(self._pick(params), []).append(j)
+        out = [None] * len(params_list)
+        for i, idx in groups.items():
+            t0 = time.perf_counter()
+            results = self.predictors[i].predict_many([params_list[j] for j in idx])
+            # Latência por cenário (o pedido batch/fan-out é amortizado pelos cenários que levou)
+            self._record(i, (time.perf_counter() - t0) * 1000 / len(idx), sum(r is None for r in results), len(idx))
+            for j, res in zip(idx, results): out[j] = res
+        return out
+
+    def stats(self):
+        with self._lock:
+            rows = {}
+            for name, p, w in zip(self.names, self.predictors, self.weights):
+                s = self.latency[name]; q = s.quantiles()
+                rows[name] = {"weight": round(w, 3), "model_version": p.model_version, "calls": s.count, "errors": s.errors,
+                              "error_rate": s.errors / s.count if s.count else 0.0, "mean_ms": s.total_ms / s.count if s.count else 0.0, "p50_ms": q[0.5], "p95_ms": q[0.95],
+                              "breaker": p.client.breaker.state if getattr(p, "client", None) is not None else None}
+            return rows
+
+
+class LocalPredictor(Predictor):
+    """Modelo linear multinomial em processo: parâmetros codificados como inteiros -> soma de pesos -> softmax."""
+    cacheable = remote = False
+
+    def __init__(self, classes, bias, weights, version="local"):
+        self.classes, self.version, self.model_version = list(classes), version, version
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)  # (sum(SHAPE), n_classes)
+        self.offsets = np.concatenate([[0], np.cumsum(SHAPE)[:-1]])
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        with open(path) as f: art = json.load(f)
+        k = len(art["classes"])
+        rows = [art["weights"].get(key, {}).get(str(v), [0.0] * k) for key, axis in zip(PARAM_KEYS, AXES) for v in axis]
+        return cls(art["classes"], art["bias"], rows, art.get("version", "local"))
+
+    def encode(self, params_list):
+        return np.array([cell_index(p) for p in params_list], dtype=np.int64)
+
+    def score(self, X):
+        logits = self.bias + self.weights[X + self.offsets].sum(axis=1)
+        e = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+    def _response(self, row):
+        return {"probabilities": {c: f"{p * 100:.2f}%" for c, p in zip(self.classes, row)}, "severity_text": self.classes[int(row.argmax())]}
+
+    def predict(self, params):
+        if cell_index(params) is None: return None, f"Unknown parameters: {params}"
+        return self._response(self.score(self.encode([params]))[0]), None
+
+    def predict_many(self, params_list):
+        ok = [i for i, p in enumerate(params_list) if cell_index(p) is not None]
+        out = [None] * len(params_list)
+        if ok:
+            for i, row in zip(ok, self.score(self.encode([params_list[i] for i in ok]))): out[i] = self._response(row)
+        return out
+
+
+def make_predictor(backend="http", **kw):
+    if backend == "local": return LocalPredictor.load(kw.get("model_path") or DEFAULT_MODEL_PATH)
+    http = lambda url, batch_url, client: HttpPredictor(url, batch_url, kw.get("max_workers", 8), kw.get("timeout", 10), client, version_ttl=kw.get("version_ttl", 60), gate=kw.get("gate"))
+    primary = http(kw["api_url"], kw.get("batch_url"), kw.get("client"))
+    if not kw.get("canary_url"): return primary
+    # Segundo backend com uma fração do tráfego (ex.: modelo mais rápido em canary antes da troca completa);
+    # cliente próprio, para que as falhas do canary não abram o circuit breaker do primário
+    weight = float(kw.get("canary_weight", 0.1))
+    return RoutedPredictor([("primary", primary, 1.0 - weight), ("canary", http(kw["canary_url"], kw.get("canary_batch_url"), kw.get("canary_client")), weight)])
@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from .assets import logo_bytes
+from .cache import PredictionCache, make_key
+from .config import ROOT
+from .grid import RiskGrid
+from .http_pool import PooledClient
+from .limits import AdmissionGate, TokenBucket
+from .predictors import make_predictor
+from .single_flight import SingleFlight
+from .store import PredictionStore, StoreRefresher
+
+# Recursos partilhados por todas as sessões do processo (st.cache_resource), comuns a app.py e app2.py
+
+
+@st.cache_data
+def load_image_local():
+    # Logo pré-processado (saferoute.assets); o PIL só é usado se o asset faltar ou a fonte tiver mudado
+    try: return logo_bytes()
+    except Exception: return None
+
+@st.cache_resource
+def get_prediction_cache():
+    # Cache partilhado por todas as sessões do processo
+    return PredictionCache(maxsize=st.secrets.get("CACHE_MAXSIZE", 4096), ttl=st.secrets.get("CACHE_TTL", 3600), disk_path=st.secrets.get("CACHE_DB_PATH"),
+                           disk_maxsize=st.secrets.get("CACHE_DISK_MAXSIZE"))
+
+@st.cache_resource
+def get_risk_grid():
+    # Grelha pré-calculada (python -m saferoute.grid); None se ainda não foi gerada
+    return RiskGrid.load(st.secrets.get("GRID_PATH", os.path.join(ROOT, "risk_grid")))
+
+@st.cache_resource
+def get_http_client(backend="primary"):
+    # Pool keep-alive partilhado (sem novo handshake TLS por clique), retries e circuit breaker;
+    # um por backend ("primary", "canary", "regions"), para que a falha de um não feche o circuito dos outros
+    return PooledClient(pool_size=st.secrets.get("HTTP_POOL_SIZE", 20), retries=st.secrets.get("HTTP_RETRIES", 2), backoff=st.secrets.get("HTTP_BACKOFF", 0.3),
+                        breaker_threshold=st.secrets.get("BREAKER_THRESHOLD", 5), breaker_reset=st.secrets.get("BREAKER_RESET_S", 30))
+
+@st.cache_resource
+def get_predictor():
+    # Backend escolhido na configuração: "http" (API remota) ou "local" (modelo em processo, carregado uma vez);
+    # com API_URL_CANARY, CANARY_WEIGHT do tráfego vai para o segundo backend
+    return make_predictor(st.secrets.get("PREDICTOR_BACKEND", "http"), api_url=st.secrets.get("API_URL", "http://127.0.0.1:8000/predict"), batch_url=st.secrets.get("BATCH_API_URL"),
+                          max_workers=st.secrets.get("BATCH_MAX_WORKERS", 8), timeout=st.secrets.get("PREDICT_TIMEOUT_S", 10), model_path=st.secrets.get("MODEL_PATH"), client=get_http_client("primary"),
+                          version_ttl=st.secrets.get("MODEL_VERSION_TTL_S", 60), canary_url=st.secrets.get("API_URL_CANARY"), canary_client=get_http_client("canary") if st.secrets.get("API_URL_CANARY") else None, canary_batch_url=st.secrets.get("BATCH_API_URL_CANARY"),
+                          canary_weight=st.secrets.get("CANARY_WEIGHT", 0.1), gate=get_admission_gate())
+
+@st.cache_resource
+def get_single_flight():
+    # Sessões com os mesmos parâmetros ao mesmo tempo partilham uma só chamada ao backend
+    return SingleFlight()
+
+@st.cache_resource
+def get_prediction_store():
+    # Último resultado conhecido por chave (sobrevive a reinícios) + refresher em segundo plano das chaves mais pedidas
+    predictor = get_predictor()
+    if not predictor.cacheable: return None
+    store = PredictionStore(st.secrets.get("STORE_PATH", os.path.join(ROOT, "data", "predictions.sqlite")))
+    cache = get_prediction_cache()
+    store.refresher = StoreRefresher(store, predictor, on_result=lambda done: cache.set_many([(make_key(params, version), res) for params, res, version in done]), interval=st.secrets.get("REFRESH_INTERVAL_S", 30),
+                                     idle_after=st.secrets.get("REFRESH_IDLE_S", 10), top_n=st.secrets.get("REFRESH_TOP_N", 50), max_age=st.secrets.get("REFRESH_MAX_AGE_S", 900))
+    store.refresher.start()
+    return store
+
+@st.cache_resource
+def get_executor():
+    # Pool de fundo para as previsões: o script fica livre para reagir a cliques e mudanças de input
+    return ThreadPoolExecutor(max_workers=st.secrets.get("PREDICT_WORKERS", 16), thread_name_prefix="predict")
+
+@st.cache_resource
+def get_admission_gate():
+    # Teto de chamadas simultâneas ao backend para todo o processo; acima disso espera no máximo ADMISSION_WAIT_S
+    return AdmissionGate(max_concurrent=st.secrets.get("MAX_CONCURRENT_PREDICTS", 8), max_wait=st.secrets.get("ADMISSION_WAIT_S", 2))
+
+def session_bucket(kind="click"):
+    # Token buckets por sessão do browser (guardados em st.session_state): "click" conta cliques de cenário único,
+    # "batch" conta chamadas ao backend de Compare/perfil/mapa (um token por cenário que falhou grelha e cache)
+    key = f"rate_bucket_{kind}"
+    if key not in st.session_state:
+        st.session_state[key] = (TokenBucket(st.secrets.get("RATE_LIMIT_PER_MIN", 20) / 60, st.secrets.get("RATE_LIMIT_BURST", 5)) if kind == "click" else
+                                 TokenBucket(st.secrets.get("RATE_LIMIT_BATCH_PER_MIN", 300) / 60, st.secrets.get("RATE_LIMIT_BATCH_BURST", 300)))
+    return st.session_state[key]
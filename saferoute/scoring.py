@@ -0,0 +1,39 @@
+import numpy as np
+
+# (limite superior exclusivo, estilo) por ordem crescente; o último nível apanha tudo o resto
+IDF_RISK_LEVELS = ((0.15, {"color": "#10B981", "label": "LOW RISK", "msg": "Conditions likely safe."}),
+                   (0.40, {"color": "#F59E0B", "label": "MODERATE", "msg": "Increased vigilance required."}),
+                   (float("inf"), {"color": "#EF4444", "label": "CRITICAL", "msg": "High probability of severe accident."}))
+REGION_RISK_LEVELS = ((0.3, {"color": "#10B981", "label": "SAFE", "msg": "Low risk detected."}),
+                      (0.7, {"color": "#F59E0B", "label": "MODERATE", "msg": "Exercise caution."}),
+                      (float("inf"), {"color": "#EF4444", "label": "CRITICAL", "msg": "High danger zone."}))
+
+
+def get_risk_style(prob, levels=IDF_RISK_LEVELS):
+    for upper, style in levels:
+        if prob < upper: return style
+    return levels[-1][1]
+
+
+def hex_to_rgb(color):
+    c = color.lstrip('#')
+    return [int(c[i:i+2], 16) for i in (0, 2, 4)]
+
+
+def risk_colors(risks, levels=IDF_RISK_LEVELS, alpha=170):
+    # Vetorizado: um searchsorted sobre os limiares dá o nível de cada risco de uma vez
+    table = np.array([hex_to_rgb(style["color"]) + [alpha] for _, style in levels], dtype=np.uint8)
+    return table[np.searchsorted(np.array([upper for upper, _ in levels[:-1]]), np.asarray(risks, dtype=float), side="right")]
+
+
+def risk_cell_css(v, levels=IDF_RISK_LEVELS):
+    # Cor de fundo das tabelas/heatmaps com os mesmos limiares do cartão
+    return "" if v is None or v != v else f"background-color: {get_risk_style(v, levels)['color']}; color: white"
+
+
+def clean_probabilities(res):
+    return {k: (float(str(v).strip('%'))/100) for k, v in res.get("probabilities", {}).items()}
+
+
+def severity_risk(clean_probs):
+    return clean_probs.get("Death", 0.0) + clean_probs.get("Hospitalized", 0.0)
@@ -0,0 +1,118 @@
+import numpy as np
+import streamlit as st
+
+from .cache import make_key
+from .config import days_list, hours_list
+from .limits import BUSY_MSG
+from .resources import get_admission_gate, get_http_client, get_predictor, get_prediction_cache, get_prediction_store, get_risk_grid, get_single_flight
+from .scoring import clean_probabilities, severity_risk
+from .timing import span
+
+# Caminho de uma previsão (grelha -> cache -> backend), sem widgets: as páginas só tratam do layout
+
+
+def grid_version(predictor, params):
+    # Versão que a grelha tem de ter para ser servida: GRID_VERSION fixa, ou a do modelo que responde a estes parâmetros
+    return st.secrets.get("GRID_VERSION") or predictor.version_for(params)
+
+def admitted(bucket, gate):
+    # Token da sessão gasto só quando grelha e cache falharam e é mesmo preciso ir ao backend;
+    # o gate é resolvido pelo chamador no thread do script (pode correr no executor)
+    if bucket is None or bucket.take(): return True
+    gate.note_throttled()
+    return False
+
+def prediction_job(params, use_grid=False, bucket=None):
+    # Resolve os recursos no thread do script; a função devolvida só usa objetos simples e pode correr no executor
+    grid = get_risk_grid() if use_grid else None
+    fallback = None if use_grid else get_risk_grid()
+    predictor = get_predictor(); key = make_key(params, predictor.version_for(params))
+    version = grid_version(predictor, params)
+    cache = get_prediction_cache() if predictor.cacheable else None
+    store = get_prediction_store()
+    flight, timeout, gate = get_single_flight(), st.secrets.get("PREDICT_TIMEOUT_S", 10), get_admission_gate()
+    def degraded():
+        # Sem vaga no backend: grelha pré-calculada se existir; senão erro (a página cai para o último resultado do store)
+        res = fallback.lookup(params, version=version) if fallback is not None else None
+        return (res, None) if res is not None else (None, BUSY_MSG)
+    def call():
+        # A espera pela vaga do gate (dentro do predictor) acontece aqui, no executor: o script continua livre para o botão Cancel
+        res, err = predictor.predict(params)
+        if err == BUSY_MSG: return degraded()
+        # A resposta pode trazer uma versão nova: guarda sob a versão que realmente a produziu
+        version = predictor.version_for(params)
+        if err is None and cache is not None: cache.set(make_key(params, version), res)
+        if err is None and store is not None: store.put(params, res, version)
+        return res, err
+    def job():
+        if store is not None: store.touch(params)
+        with span("fetch"):
+            res = grid.lookup(params, version=version) if grid is not None else None
+            if res is not None: return res, None
+            if cache is None: return predictor.predict(params)
+            res = cache.get(key)
+            if res is not None: return res, None
+            if not admitted(bucket, gate): return degraded()  # sessão acima do limite: nunca partilha o voo dos outros
+            return flight.do(key, call, timeout=timeout)
+    return job
+
+def fetch_predictions(params_list, use_grid=False, bucket=None):
+    # Grelha/cache primeiro; só as falhas vão ao backend, num único pedido batch ou em fan-out limitado
+    grid = get_risk_grid() if use_grid else None; predictor = get_predictor()
+    cache = get_prediction_cache() if predictor.cacheable else None
+    store = get_prediction_store()
+    if store is not None: store.mark_active()  # Compare/perfil/mapa também contam como atividade para o refresher
+    results, misses = [], []
+    for i, params in enumerate(params_list):
+        res = grid.lookup(params, version=grid_version(predictor, params)) if grid is not None else None
+        if res is None and cache is not None: res = cache.get(make_key(params, predictor.version_for(params)))
+        if res is None: misses.append(i)
+        results.append(res)
+    # Cada cenário que vai ao backend custa um token do bucket "batch"; sem tokens suficientes só os primeiros vão
+    granted = len(misses) if bucket is None else bucket.take_up_to(len(misses))
+    if granted < len(misses): get_admission_gate().note_throttled()
+    if granted:
+        sent = misses[:granted]; todo = [params_list[i] for i in sent]
+        done = []
+        for i, params, res in zip(sent, todo, predictor.predict_many(todo)):
+            results[i] = res
+            if res is not None: done.append((params, res, predictor.version_for(params)))
+        # Um só commit por lote em cada camada, em vez de um por cenário
+        if cache is not None: cache.set_many([(make_key(params, version), res) for params, res, version in done])
+        if store is not None: store.put_many(done)
+    # Sessão acima do limite, backend saturado ou com erro: as falhas ainda podem vir da grelha (mesmo fora do modo grelha)
+    fallback = None if use_grid else get_risk_grid()
+    if fallback is not None:
+        for i in misses:
+            if results[i] is None: results[i] = fallback.lookup(params_list[i], version=grid_version(predictor, params_list[i]))
+    return results
+
+class ProfileIncomplete(Exception):
+    # Levantada para que st.cache_data não memorize um perfil com células em falta
+    def __init__(self, matrix): super().__init__("incomplete profile"); self.matrix = matrix
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def risk_profile(department, road, speed, surface, use_grid, model_version, _bucket=None):
+    # Matriz 7 dias x 24 horas de risco (Death + Hospitalized) numa só passagem batch (grelha/cache primeiro);
+    # model_version só entra na chave do memo, para que um rollout não sirva perfis do modelo antigo
+    params_list = [{"department": department, "day_of_week": d, "hour": h, "road_category": road, "speed_limit": speed, "surface_condition": surface} for d in days_list for h in hours_list]
+    results = fetch_predictions(params_list, use_grid=use_grid, bucket=_bucket)
+    matrix = np.array([severity_risk(clean_probabilities(r)) if r is not None else np.nan for r in results]).reshape(len(days_list), len(hours_list))
+    if np.isnan(matrix).any(): raise ProfileIncomplete(matrix)
+    return matrix
+
+# --- REGIÕES (app2.py) ---
+def fetch_region(url, region, timeout=8):
+    # Devolve (resultado, erro) como Predictor.predict; erro None se o backend respondeu 200
+    with span("app2.http_call"):
+        response = get_http_client("regions").get(url, params={'region': region}, timeout=timeout)
+    if response.status_code != 200: return None, f"HTTP {response.status_code}"
+    with span("app2.json_parse"):
+        return response.json(), None
+
+def fetch_regions(url, regions):
+    # Todas as regiões em paralelo (httpx assíncrono), com concorrência e prazo limitados;
+    # import tardio para que app.py, que também importa este módulo, não carregue o httpx
+    from .async_client import fetch_all
+    with span("app2.fanout_all_regions"):
+        return fetch_all(url, [{'region': r} for r in regions], concurrency=st.secrets.get("FANOUT_CONCURRENCY", 12), deadline=st.secrets.get("FANOUT_DEADLINE_S", 8))
@@ -0,0 +1,49 @@
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event, self.result, self.error = threading.Event(), None, None
+
+
+class SingleFlight:
+    """Pedidos concorrentes com a mesma chave partilham uma única chamada em curso (nada fica guardado depois)."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = self.coalesced = self.timeouts = self.errors = 0
+
+    def do(self, key, fn, timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(); self.leaders += 1
+            else:
+                self.coalesced += 1
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except Exception as e:
+                call.error = e
+                with self._lock: self.errors += 1
+                raise
+            finally:
+                with self._lock: self._calls.pop(key, None)
+                call.event.set()
+        # Espera limitada pelo mesmo timeout do pedido original
+        if not call.event.wait(timeout):
+            with self._lock: self.timeouts += 1
+            raise TimeoutError(f"Timed out after {timeout}s waiting for an identical in-flight prediction")
+        if call.error is not None: raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {"in_flight": len(self._calls), "backend_calls": self.leaders, "coalesced": self.coalesced, "timeouts": self.timeouts, "errors": self.errors,
+                    "coalesced_rate": (self.coalesced / total) if total else 0.0}
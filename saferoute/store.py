@@ -0,0 +1,108 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .cache import make_key
+
+
+class PredictionStore:
+    """Último resultado conhecido por combinação de parâmetros (SQLite), com data, versão do modelo e nº de pedidos."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, params TEXT NOT NULL, value TEXT, model_version TEXT, updated_at REAL, requests INTEGER NOT NULL DEFAULT 0)")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self.last_activity = time.monotonic()
+        self._touches, self._touch_lock = {}, threading.Lock()
+
+    def mark_active(self):
+        # Utilizadores ativos (qualquer modo): o refresher espera por idle_after segundos de silêncio
+        self.last_activity = time.monotonic()
+
+    def touch(self, params):
+        # Conta o pedido (alimenta a lista de chaves quentes) e marca atividade do utilizador; só em memória,
+        # para não pôr uma escrita em SQLite no caminho de cada pedido (flush_touches grava em lote)
+        self.mark_active()
+        key = make_key(params)
+        with self._touch_lock:
+            entry = self._touches.get(key)
+            if entry is None: self._touches[key] = [params, 1]
+            else: entry[1] += 1
+
+    def flush_touches(self):
+        # Chamado pelo refresher: um só executemany + commit para todos os pedidos contados desde o último flush
+        with self._touch_lock: pending, self._touches = self._touches, {}
+        if not pending: return 0
+        with self._lock:
+            self._db.executemany("INSERT INTO predictions (key, params, requests) VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET requests = requests + excluded.requests",
+                                 [(json.dumps(key), json.dumps(params), n) for key, (params, n) in pending.items()])
+            self._db.commit()
+        return len(pending)
+
+    def put(self, params, value, model_version=None):
+        self.put_many([(params, value, model_version)])
+
+    def put_many(self, items):
+        # items: (params, valor, versão); um só executemany + commit para um lote inteiro (Compare/perfil/mapa, refresher)
+        if not items: return
+        now = time.time()
+        with self._lock:
+            self._db.executemany("INSERT INTO predictions (key, params, value, model_version, updated_at) VALUES (?, ?, ?, ?, ?) "
+                                 "ON CONFLICT(key) DO UPDATE SET value = excluded.value, model_version = excluded.model_version, updated_at = excluded.updated_at",
+                                 [(json.dumps(make_key(params)), json.dumps(params), json.dumps(value), version, now) for params, value, version in items])
+            self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value, model_version, updated_at FROM predictions WHERE key = ? AND value IS NOT NULL", (json.dumps(key),)).fetchone()
+        return {"value": json.loads(row[0]), "model_version": row[1], "updated_at": row[2]} if row else None
+
+    def hot_keys(self, limit, older_than):
+        # Mais pedidas primeiro, só as que alguém pediu e nunca foram guardadas ou já passaram de `older_than` segundos
+        with self._lock:
+            rows = self._db.execute("SELECT params FROM predictions WHERE requests > 0 AND (updated_at IS NULL OR updated_at < ?) ORDER BY requests DESC LIMIT ?",
+                                    (time.time() - older_than, int(limit))).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def stats(self):
+        with self._lock:
+            n, stored, reqs, oldest = self._db.execute("SELECT COUNT(*), COUNT(value), COALESCE(SUM(requests), 0), MIN(updated_at) FROM predictions").fetchone()
+        with self._touch_lock: pending = sum(n for _, n in self._touches.values())
+        return {"keys": n, "stored": stored, "requests": reqs, "pending_touches": pending, "oldest_age_s": (time.time() - oldest) if oldest else None}
+
+
+class StoreRefresher(threading.Thread):
+    """Em tempo ocioso, volta a pontuar as chaves mais pedidas para o store (e o cache) não envelhecerem."""
+
+    def __init__(self, store, predictor, on_result=None, interval=30.0, idle_after=10.0, top_n=50, max_age=900.0):
+        super().__init__(daemon=True, name="store-refresher")
+        self.store, self.predictor, self.on_result = store, predictor, on_result  # on_result([(params, resultado, versão), ...]) por ciclo
+        self.interval, self.idle_after, self.top_n, self.max_age = float(interval), float(idle_after), int(top_n), float(max_age)
+        self.refreshed = self.failed = self.cycles = 0
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            self.store.flush_touches()  # mesmo com utilizadores ativos, para a contagem de chaves quentes não se atrasar
+            if time.monotonic() - self.store.last_activity < self.idle_after: continue
+            todo = self.store.hot_keys(self.top_n, self.max_age)
+            if not todo: continue
+            self.cycles += 1
+            try: results = self.predictor.predict_many(todo)
+            except Exception: results = [None] * len(todo)
+            done = [(params, res, self.predictor.version_for(params)) for params, res in zip(todo, results) if res is not None]
+            self.failed += len(todo) - len(done); self.refreshed += len(done)
+            self.store.put_many(done)
+            if self.on_result: self.on_result(done)
+
+    def stop(self):
+        self._halt.set()
+        self.store.flush_touches()
+
+    def stats(self):
+        return {"cycles": self.cycles, "refreshed": self.refreshed, "failed": self.failed, "alive": self.is_alive()}
@@ -0,0 +1,124 @@
+from functools import lru_cache
+
+# CSS e HTML estáticos das duas apps: construídos uma vez por processo e reutilizados em cada rerun
+
+# --- ÎLE-DE-FRANCE (app.py) ---
+APP_CSS = """
+    <style>
+        @keyframes gradient { 0% { background-position: 0% 50%; } 50% { background-position: 100% 50%; } 100% { background-position: 0% 50%; } }
+        .stApp { background: linear-gradient(-45deg, #1e3a8a, #3b82f6, #06b6d4, #10b981); background-size: 400% 400%; animation: gradient 15s ease infinite; font-family: 'Inter', sans-serif; }
+        [data-testid="stSidebar"] { display: none; }
+        .glass-container { background: rgba(255, 255, 255, 0.90); backdrop-filter: blur(16px); -webkit-backdrop-filter: blur(16px); border-radius: 20px; border: 1px solid rgba(255, 255, 255, 0.6); padding: 1.5rem; box-shadow: 0 8px 32px 0 rgba(31, 38, 135, 0.15); margin-bottom: 2rem; }
+        .stSelectbox > div > div { background-color: #f8fafc !important; border: 1px solid #cbd5e1 !important; border-radius: 10px !important; color: #334155 !important; }
+        .stButton > button { background: #0f172a !important; color: white !important; border: none; border-radius: 12px; padding: 0.8rem 2rem; font-weight: 600; width: 100%; transition: all 0.3s ease; margin-top: 1rem; }
+        .stButton > button:hover { transform: translateY(-2px); background: #334155 !important; }
+        .custom-title { font-size: 3.5rem; font-weight: 900; letter-spacing: -2px; margin: 0; line-height: 1; background: -webkit-linear-gradient(45deg, #0f172a 30%, #2563eb 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent; }
+        .custom-subtitle { font-size: 1.1rem; font-weight: 700; color: #475569; margin-bottom: 0px; text-transform: uppercase; letter-spacing: 2px; opacity: 0.9; }
+        .ver-badge { background: #e2e8f0; color: #475569; padding: 6px 12px; border-radius: 20px; font-size: 12px; font-weight: 700; white-space: nowrap; }
+    </style>
+"""
+HEADER_TITLE_HTML = "<div style='margin-top: 50px; margin-left: -60px;'><p class='custom-subtitle'>AI Risk System</p><h1 class='custom-title'>Île-de-France</h1></div>"
+HEADER_BADGE_HTML = "<div style='text-align: right; margin-top: 60px;'><span class='ver-badge'>v3.1 Pro</span></div>"
+FOOTER_HTML = "<div style='text-align: center; margin-top: 3rem; color: rgba(255,255,255,0.5); font-size: 12px;'>SafeRoute AI Engine • Île-de-France Sector • v3.1</div>"
+
+# --- FRANÇA (app2.py) ---
+FRANCE_CSS = """
+    <style>
+        /* --- ANIMAÇÃO DE FUNDO (O Efeito Canvas) --- */
+        @keyframes gradient {
+            0% { background-position: 0% 50%; }
+            50% { background-position: 100% 50%; }
+            100% { background-position: 0% 50%; }
+        }
+
+        .stApp {
+            /* Fundo Gradiente Animado Moderno */
+            background: linear-gradient(-45deg, #ee7752, #e73c7e, #23a6d5, #23d5ab);
+            background-size: 400% 400%;
+            animation: gradient 15s ease infinite;
+            font-family: 'Inter', sans-serif;
+        }
+
+        /* --- REMOVER ELEMENTOS PADRÃO --- */
+        [data-testid="stSidebar"] { display: none; }
+        #MainMenu { visibility: hidden; }
+        footer { visibility: hidden; }
+        [data-testid="stHeader"] { background-color: rgba(0,0,0,0); } /* Header Transparente */
+
+        /* --- GLASSMORPHISM CONTAINER (O Efeito de Vidro) --- */
+        .glass-container {
+            background: rgba(255, 255, 255, 0.85);
+            backdrop-filter: blur(12px);
+            -webkit-backdrop-filter: blur(12px);
+            border-radius: 20px;
+            border: 1px solid rgba(255, 255, 255, 0.3);
+            padding: 2rem;
+            box-shadow: 0 8px 32px 0 rgba(31, 38, 135, 0.15);
+            margin-bottom: 2rem;
+        }
+
+        /* --- TYPOGRAPHY --- */
+        h1 { color: #1e293b !important; font-weight: 800 !important; letter-spacing: -1px; }
+        h3 { color: #475569 !important; font-weight: 500 !important; }
+        
+        /* --- INPUT STYLING --- */
+        .stSelectbox > div > div {
+            background-color: white !important;
+            border: 2px solid #e2e8f0 !important;
+            border-radius: 12px !important;
+            color: #333 !important;
+            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
+        }
+
+        /* --- BOTÃO MODERNIZADO --- */
+        .stButton > button {
+            background: #111827 !important; /* Preto Clean estilo Vercel/Apple */
+            color: white !important;
+            border: none;
+            border-radius: 12px;
+            padding: 0.75rem 2rem;
+            font-weight: 600;
+            width: 100%;
+            transition: all 0.3s ease;
+            box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1);
+        }
+        .stButton > button:hover {
+            transform: translateY(-3px);
+            box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
+            background: #000000 !important;
+        }
+        
+        /* --- METRIC FIX --- */
+        [data-testid="stMetricLabel"] { color: #64748b !important; font-size: 14px !important; }
+        [data-testid="stMetricValue"] { color: #0f172a !important; font-size: 36px !important; font-weight: 700 !important; }
+
+    </style>
+"""
+FRANCE_NAVBAR_HTML = "<div style='font-size: 24px; font-weight: 800; color: #2563EB;'>🛡️ SafeRoute <span style='color: #94a3b8;'>France</span></div>"
+FRANCE_BADGE_HTML = "<div style='text-align: right; color: #64748b; font-size: 12px; border: 1px solid #cbd5e1; padding: 4px 8px; border-radius: 20px; display: inline-block;'>v2.1 Live</div>"
+FRANCE_FOOTER_HTML = """
+<div style="text-align: center; margin-top: 2rem; color: rgba(255,255,255,0.6); font-size: 12px;">
+    SafeRoute AI © 2024
+</div>
+"""
+
+
+# --- CARTÕES ---
+def risk_card_html(style, risk, most_likely, badge=""):
+    return f"<div class='glass-container' style='border-left: 10px solid {style['color']}; padding: 1.5rem;'>{badge}<h5 style='color:#64748b'>Severity Risk Level</h5><h1 style='color:{style['color']}'>{risk:.1%}</h1><h3 style='color:#334155'>Most Likely: {most_likely}</h3><p style='color:#64748b'>{style['msg']}</p></div>"
+
+
+@lru_cache(maxsize=16)
+def report_card_html(color_hex, risk_label, msg):
+    # Só há três níveis, por isso o HTML de cada um é gerado uma única vez
+    return f"""
+                <div class='glass-container' style='border-left: 8px solid {color_hex};'>
+                    <div style='display: flex; justify-content: space-between; align-items: center;'>
+                        <div>
+                            <h4 style='margin:0; color: #64748b;'>Assessment Report</h4>
+                            <h2 style='margin:0; color: {color_hex};'>{risk_label}</h2>
+                            <p style='margin:0; color: #334155;'>{msg}</p>
+                        </div>
+                    </div>
+                </div>
+                """
@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageStats:
+    """Janela deslizante das últimas `window` durações (ms) de uma etapa."""
+
+    def __init__(self, window=2048):
+        self.samples = deque(maxlen=window)
+        self.count, self.total_ms, self.errors = 0, 0.0, 0
+
+    def add(self, ms, error=False):
+        self.samples.append(ms)
+        self.count += 1; self.total_ms += ms; self.errors += int(error)
+
+    def quantiles(self):
+        data = sorted(self.samples)
+        if not data: return {q: 0.0 for q in QUANTILES}
+        return {q: data[min(len(data) - 1, int(q * len(data)))] for q in QUANTILES}
+
+
+class Timings:
+    def __init__(self, window=2048):
+        self.window = window
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._jsonl = None
+
+    def record(self, stage, ms, error=False):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None: stats = self.stages[stage] = StageStats(self.window)
+            stats.add(ms, error)
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps({"ts": time.time(), "stage": stage, "ms": round(ms, 3), "error": error}) + "\n"); self._jsonl.flush()
+
+    @contextmanager
+    def span(self, stage):
+        t0, error = time.perf_counter(), False
+        try:
+            yield
+        except BaseException:
+            error = True; raise
+        finally:
+            self.record(stage, (time.perf_counter() - t0) * 1000, error)
+
+    def snapshot(self):
+        with self._lock:
+            rows = []
+            for name, s in self.stages.items():
+                q = s.quantiles()
+                rows.append({"stage": name, "count": s.count, "errors": s.errors, "mean_ms": s.total_ms / s.count if s.count else 0.0,
+                             "p50_ms": q[0.5], "p95_ms": q[0.95], "p99_ms": q[0.99]})
+            return rows
+
+    def reset(self):
+        with self._lock: self.stages.clear()
+
+    # --- EXPORTAÇÃO ---
+    def export_jsonl(self, path):
+        with self._lock:
+            if self._jsonl is None: self._jsonl = open(path, "a", buffering=1)
+
+    def prometheus_text(self):
+        lines = ["# HELP saferoute_stage_latency_ms Latency per prediction-flow stage (rolling window).", "# TYPE saferoute_stage_latency_ms summary"]
+        for r in self.snapshot():
+            lbl = r["stage"].replace('"', "'")
+            for q, key in ((0.5, "p50_ms"), (0.95, "p95_ms"), (0.99, "p99_ms")):
+                lines.append(f'saferoute_stage_latency_ms{{stage="{lbl}",quantile="{q}"}} {r[key]:.3f}')
+            lines.append(f'saferoute_stage_latency_ms_sum{{stage="{lbl}"}} {r["mean_ms"] * r["count"]:.3f}')
+            lines.append(f'saferoute_stage_latency_ms_count{{stage="{lbl}"}} {r["count"]}')
+            lines.append(f'saferoute_stage_errors_total{{stage="{lbl}"}} {r["errors"]}')
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port, host="127.0.0.1"):
+        timings = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics": self.send_error(404); return
+                body = timings.prometheus_text().encode()
+                self.send_response(200); self.send_header("Content-Type", "text/plain; version=0.0.4"); self.send_header("Content-Length", str(len(body))); self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+        return server
+
+
+# Registo único por processo
+timings = Timings()
+span = timings.span
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Só o que um run sem resultado não deve carregar: numpy (grelha em mmap) e requests (predictor HTTP) são
+# precisos em todos os runs e por isso não entram aqui; PIL também não: st.image importa-o sempre
+# (image_to_url), mesmo com o logo já pré-processado em bytes
+HEAVY = ("pandas", "pydeck", "httpx")
+
+# Corre a app uma vez em processo novo (cold start) e depois N reruns (warm), sem clicar em nada
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.secrets["PREDICTOR_BACKEND"] = "local"
+at.run()
+cold = time.perf_counter() - t0
+warm = []
+for _ in range(int(sys.argv[2])):
+    t = time.perf_counter(); at.run(); warm.append(time.perf_counter() - t)
+print("@@" + json.dumps({"cold_s": cold, "warm_s": warm, "exceptions": [str(e.value) for e in at.exception], "loaded": sorted(m for m in sys.modules if "." not in m)}))
+"""
+
+
+def import_times(script, reruns):
+    # -X importtime escreve "import time: self [us] | cumulative | package" no stderr
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROBE, script, str(reruns)], capture_output=True, text=True, cwd=HERE)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line: continue
+        _, cum, name = (x.strip() for x in line[len("import time:"):].split("|"))
+        if "." not in name: cumulative[name] = max(cumulative.get(name, 0), int(cum))
+    out = next((l[2:] for l in proc.stdout.splitlines() if l.startswith("@@")), None)
+    if out is None: sys.exit(f"probe failed:\n{proc.stderr[-2000:]}")
+    return cumulative, json.loads(out)
+
+
+def measure(script, reruns):
+    cumulative, run = import_times(script, reruns)
+    warm_ms = sorted(x * 1000 for x in run["warm_s"])
+    return {
+        "script": script,
+        "cold_start_ms": run["cold_s"] * 1000,
+        "warm_rerun_p50_ms": statistics.median(warm_ms),
+        "warm_rerun_max_ms": warm_ms[-1],
+        "import_ms": {k: cumulative[k] / 1000 for k in sorted(cumulative, key=cumulative.get, reverse=True)[:15]},
+        "heavy_loaded_without_result": [m for m in HEAVY if m in run["loaded"]],
+        "exceptions": run["exceptions"],
+    }
+
+
+def report(r, before=None):
+    def line(label, key):
+        delta = f"  ({r[key] - before[key]:+.1f} ms vs before)" if before and key in before else ""
+        print(f"{label:<22}{r[key]:>9.1f} ms{delta}")
+    print(f"== {r['script']}")
+    line("cold start", "cold_start_ms"); line("warm rerun p50", "warm_rerun_p50_ms"); line("warm rerun max", "warm_rerun_max_ms")
+    print("heavy modules loaded on idle run:", ", ".join(r["heavy_loaded_without_result"]) or "none")
+    print("top imports (cumulative):")
+    for name, ms in r["import_ms"].items(): print(f"  {name:<28}{ms:>9.1f} ms")
+    if r["exceptions"]: print("app exceptions:", *r["exceptions"], sep="\n  ")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Mede import time (-X importtime), cold start e latência de rerun da app")
+    ap.add_argument("script", nargs="?", default="app.py")
+    ap.add_argument("--reruns", type=int, default=20)
+    ap.add_argument("--json", help="grava o resultado (ex.: before.json)")
+    ap.add_argument("--compare", help="resultado anterior para comparar")
+    # Orçamentos absolutos só quando dados (medidos na máquina de deploy); senão compara com --compare
+    ap.add_argument("--budget-cold-ms", type=float)
+    ap.add_argument("--budget-rerun-ms", type=float)
+    ap.add_argument("--max-regression", type=float, default=0.10, help="fração tolerada acima do resultado de --compare")
+    a = ap.parse_args()
+    r = measure(a.script, a.reruns)
+    before = None
+    if a.compare:
+        with open(a.compare) as f: before = json.load(f)
+    report(r, before)
+    if a.json:
+        with open(a.json, "w") as f: json.dump(r, f, indent=2)
+    budgets = {"cold_start_ms": a.budget_cold_ms, "warm_rerun_p50_ms": a.budget_rerun_ms}
+    if before:
+        for k in budgets:
+            if budgets[k] is None: budgets[k] = before[k] * (1 + a.max_regression)
+    over = [f"{k} {r[k]:.0f} > {b:.0f} ms" for k, b in budgets.items() if b is not None and r[k] > b]
+    if r["heavy_loaded_without_result"]: over.append("heavy imports on idle run: " + ", ".join(r["heavy_loaded_without_result"]))
+    if over: sys.exit("over budget: " + "; ".join(over))